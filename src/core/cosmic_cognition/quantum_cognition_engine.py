@@ -8,7 +8,7 @@ import asyncio
 import json
 import hashlib
 
-from src.core.memory_subsystem.permanent_memory import PermanentMemory
+from src.core.memory.permanent_memory import PermanentMemory
 from src.protocol.integrity_verification.cryptographic_proofs import sign_data_with_quantum_resistant_key
 from src.utils.cryptographic_utils import json_to_canonical_bytes
 
@@ -102,17 +102,24 @@ class QuantumCognitionEngine:
 
     async def trace_log_chain(self, starting_cid: str, depth: int = 3) -> list[dict]:
         logging.info(f"QCE ({self.engine_did}): Tracing log chain from CID: {starting_cid} (depth={depth})")
+        # The chain is resolved from the local provenance index and its logs fetched together.
+        cids = [starting_cid] + self.permanent_memory.ancestors(starting_cid, depth - 1, via="source_processed_data_cid")
+        logs = await asyncio.gather(*(self.permanent_memory.retrieve_memory_by_cid(cid) for cid in cids))
         chain = []
-        current_cid = starting_cid
-        for _ in range(depth):
-            log = await self.permanent_memory.retrieve_memory_by_cid(current_cid)
+        for log in logs:
             if not log:
                 break
             chain.append(log)
-            next_cid = log.get("content", {}).get("data", {}).get("source_processed_data_cid")
-            if not next_cid or next_cid == current_cid:
+        # Logs indexed before provenance tracking have no edges; follow those hop by hop.
+        while chain and len(chain) == len(cids) and len(chain) < depth:
+            next_cid = chain[-1].get("content", {}).get("data", {}).get("source_processed_data_cid")
+            if not next_cid or next_cid == cids[-1]:
                 break
-            current_cid = next_cid
+            log = await self.permanent_memory.retrieve_memory_by_cid(next_cid)
+            if not log:
+                break
+            chain.append(log)
+            cids.append(next_cid)
         return chain
 
     async def score_prediction_accuracy(self, prediction_logs: list[dict], actual_events: dict) -> dict:
@@ -0,0 +1,75 @@
+# src/core/memory/content_cache.py 🧠⚡
+
+import json
+import threading
+from collections import OrderedDict
+
+class ContentCache:
+    """
+    Byte-bounded LRU cache of decoded memory payloads keyed by CID.
+    CIDs are content-addressed, so cached payloads never go stale and are only
+    evicted to stay within the byte budget. Payloads are shared, not copied:
+    callers must treat them as read-only.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, cid: str):
+        return cid in self._entries
+
+    def get(self, cid: str):
+        with self._lock:
+            entry = self._entries.get(cid)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cid)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, cid: str, payload: dict, size: int = None):
+        """
+        Caches a payload. size is its encoded length in bytes before any
+        compression; when omitted it is estimated by serializing the payload.
+        Payloads larger than the whole budget are not cached.
+        """
+        if size is None:
+            size = len(json.dumps(payload).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(cid, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[cid] = (payload, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
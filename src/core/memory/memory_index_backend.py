@@ -0,0 +1,292 @@
+# src/core/memory/memory_index_backend.py 🧠🗂️
+
+import gc
+import threading
+from collections.abc import Mapping
+from src.core.memory.memory_journal import MemoryJournal
+from src.core.memory.provenance_graph import ProvenanceGraph
+from src.core.memory.tag_index import TagIndex
+from src.core.memory.time_index import TimeIndex
+
+class MemoryIndexBackend(Mapping):
+    """
+    Storage interface for the PermanentMemory index.
+    Maps entry IDs to index records ({"cid", "tags", "creator", "timestamp", ...}) and
+    answers tag and time queries. put_many may be called from worker threads.
+    """
+    def put_many(self, records: list[tuple[str, dict]]):
+        raise NotImplementedError
+
+    def get_many(self, entry_ids) -> dict:
+        return {entry_id: self[entry_id] for entry_id in entry_ids if entry_id in self}
+
+    def ids_for_tags(self, tags: list[str], match_all: bool = True) -> list[str]:
+        raise NotImplementedError
+
+    def entry_for_integrity(self, integrity: str):
+        """
+        Returns the ID of the original (non-reference) entry with this payload hash, or None.
+        """
+        raise NotImplementedError
+
+    def ids_in_time_range(self, start_time=None, end_time=None, offset: int = 0, limit: int = None) -> list[str]:
+        raise NotImplementedError
+
+    def time_page(self, start_time=None, end_time=None, after: tuple = None, limit: int = 500) -> list[tuple]:
+        """
+        Returns up to limit (timestamp key, entry ID) pairs of the window in (timestamp, ID)
+        order, starting strictly after the pair after.
+        """
+        raise NotImplementedError
+
+    def iter_time_pages(self, start_time=None, end_time=None, page_size: int = 500):
+        # Keyset paging: each page resumes after the last (timestamp, ID) seen, so entries
+        # written while a sweep runs neither repeat nor skip entries of later pages.
+        after = None
+        while True:
+            page = self.time_page(start_time, end_time, after, page_size)
+            if not page:
+                return
+            yield [entry_id for _, entry_id in page]
+            after = page[-1]
+
+    def ancestor_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        """
+        Returns the CIDs cid was derived from (through source_*_cid fields), nearest first,
+        up to depth hops. via restricts the walk to one source field.
+        """
+        raise NotImplementedError
+
+    def descendant_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        """
+        Returns the CIDs derived from cid, nearest first, up to depth hops.
+        """
+        raise NotImplementedError
+
+    @property
+    def loaded(self) -> bool:
+        """
+        False while a lazy backend has not read its index yet.
+        """
+        return True
+
+    def load(self):
+        """
+        Reads the index now instead of on first use. Blocking; async callers run it in a worker thread.
+        """
+        pass
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def compact(self):
+        pass
+
+    def refresh(self):
+        """
+        Picks up entries written by other processes sharing this index. No-op for
+        backends that read through to shared storage.
+        """
+        pass
+
+    def close(self):
+        pass
+
+class JournalIndexBackend(MemoryIndexBackend):
+    """
+    In-memory index persisted as a snapshot plus an append-only journal,
+    with tag, time and provenance indexes kept alongside.
+    With lazy=True (default) nothing is read from disk until the index is first
+    used or load() is called: constructing PermanentMemory is constant-time, and
+    the O(N) load happens later, in a worker thread for PermanentMemory's async
+    methods.
+    """
+    def __init__(self, memory_log_path: str = "./memory_log.json", compact_every: int = 10000,
+                 lazy: bool = True):
+        self.memory_log_path = memory_log_path
+        self.tag_index_path = f"{memory_log_path}.tags.json"
+        self.journal = MemoryJournal(memory_log_path, compact_every=compact_every)
+        self._lock = threading.RLock()
+        self._records = None
+        if not lazy:
+            self._ensure_loaded()
+
+    @property
+    def records(self) -> dict:
+        return self._ensure_loaded()
+
+    @property
+    def loaded(self) -> bool:
+        return self._records is not None
+
+    def load(self):
+        self._ensure_loaded()
+
+    def _ensure_loaded(self) -> dict:
+        if self._records is None:
+            with self.journal.file_lock(exclusive=False), self._lock:
+                if self._records is None:
+                    self._records = self._load_or_init_log()
+        return self._records
+
+    def _load_or_init_log(self) -> dict:
+        # Loading creates millions of small containers; pausing the cyclic GC
+        # avoids repeated full collections over objects that are all long-lived.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._load_indexes()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _load_indexes(self) -> dict:
+        records = self.journal.load_snapshot()
+        self.tag_index = TagIndex.load(self.tag_index_path, records)
+        self.time_index = TimeIndex.build(records)
+        self.provenance = ProvenanceGraph.build(records)
+        self.integrity_index = {}
+        for entry_id, record in records.items():
+            self._index_integrity(entry_id, record)
+        for entry_id, record in self.journal.replay():
+            self._index_record(records, entry_id, record)
+        return records
+
+    def _index_integrity(self, entry_id: str, record: dict):
+        if "integrity" in record and "duplicate_of" not in record:
+            self.integrity_index.setdefault(record["integrity"], entry_id)
+
+    def _index_record(self, records: dict, entry_id: str, record: dict):
+        previous = records.get(entry_id)
+        if previous is not None:
+            self.tag_index.remove(entry_id, previous["tags"])
+            self.time_index.remove(entry_id, previous["timestamp"])
+            if self.integrity_index.get(previous.get("integrity")) == entry_id:
+                del self.integrity_index[previous["integrity"]]
+        records[entry_id] = record
+        self.tag_index.add(entry_id, record["tags"])
+        self.time_index.add(entry_id, record["timestamp"])
+        self._index_integrity(entry_id, record)
+        self.provenance.add_record(record)
+
+    def __getitem__(self, entry_id: str) -> dict:
+        return self.records[entry_id]
+
+    def __contains__(self, entry_id) -> bool:
+        return entry_id in self.records
+
+    def __iter__(self):
+        return iter(list(self.records))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def put_many(self, records: list[tuple[str, dict]]):
+        self._ensure_loaded()
+        # The journal lock keeps a concurrent refresh() from reloading between the two steps.
+        with self.journal.file_lock():
+            with self._lock:
+                for entry_id, record in records:
+                    self._index_record(self._records, entry_id, record)
+            self.journal.append_many(records)
+
+    def ids_for_tags(self, tags: list[str], match_all: bool = True) -> list[str]:
+        loaded = self._ensure_loaded()
+        with self._lock:
+            return [k for k in self.tag_index.query(tags, match_all) if k in loaded]
+
+    def entry_for_integrity(self, integrity: str):
+        self._ensure_loaded()
+        return self.integrity_index.get(integrity)
+
+    def ids_in_time_range(self, start_time=None, end_time=None, offset: int = 0, limit: int = None) -> list[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return self.time_index.range(start_time, end_time, offset, limit)
+
+    def time_page(self, start_time=None, end_time=None, after: tuple = None, limit: int = 500) -> list[tuple]:
+        self._ensure_loaded()
+        with self._lock:
+            return self.time_index.page(start_time, end_time, after, limit)
+
+    def ancestor_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return self.provenance.ancestors(cid, depth, via)
+
+    def descendant_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return self.provenance.descendants(cid, depth, via)
+
+    def needs_compaction(self) -> bool:
+        return self.journal.should_compact()
+
+    def refresh(self):
+        """
+        Applies journal entries appended by other processes since the last load or
+        refresh, or reloads from disk if one of them has compacted the journal.
+        """
+        if self._records is None:
+            return
+        with self.journal.file_lock(exclusive=False), self._lock:
+            tail = self.journal.read_tail()
+            if tail is None:
+                self._records = self._load_or_init_log()
+                return
+            for entry_id, record in tail:
+                self._index_record(self._records, entry_id, record)
+
+    def compact(self):
+        self._ensure_loaded()
+        with self.journal.file_lock():
+            # Other processes' appends must be in the snapshot before the journal is truncated.
+            self.refresh()
+            entries = self.journal.compact(self._records)
+            # Under the lock, so writers compacting concurrently do not share the temporary file.
+            self.tag_index.save(self.tag_index_path, entries)
+
+    def close(self):
+        self.journal.close()
+
+if __name__ == "__main__":
+    # Startup benchmark: time to construct the index, to answer the first query
+    # (which loads it) and to answer the next one, for a synthetic history.
+    import os
+    import sys
+    import time
+    import uuid
+    import tempfile
+
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    records = {
+        str(uuid.uuid4()): {
+            "cid": f"bafkrei{i:052d}",
+            "tags": ["violation", "scanner", f"batch-{i % 50}"],
+            "creator": "ViolationScanner",
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}.{i % 1000000:06d}Z",
+            "integrity": f"{i:064x}"
+        }
+        for i in range(entries)
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "memory_log.json")
+        writer = JournalIndexBackend(path, lazy=False)
+        writer.put_many(list(records.items()))
+        writer.compact()
+        writer.close()
+        size_mb = os.path.getsize(path) / 1e6
+
+        started = time.perf_counter()
+        backend = JournalIndexBackend(path)
+        constructed = time.perf_counter()
+        backend.ids_for_tags(["batch-7"])
+        queried = time.perf_counter()
+        backend.ids_for_tags(["batch-8"])
+        requeried = time.perf_counter()
+
+        print(f"{entries} entries ({size_mb:.1f} MB snapshot): "
+              f"construct {(constructed - started) * 1000:.2f} ms, "
+              f"first query {(queried - constructed) * 1000:.0f} ms, "
+              f"next query {(requeried - queried) * 1000:.1f} ms")
@@ -0,0 +1,254 @@
+# src/core/memory/memory_journal.py 🧠📜
+
+import json
+import os
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Headers of the <snapshot_path>.snap files earlier versions compacted into instead
+# of the JSON snapshot. The pickled kind is never unpickled: loading a pickle runs
+# code chosen by whoever can write the file.
+LEGACY_SNAPSHOT_MAGIC = b"BELELIDX2\n"
+PICKLE_SNAPSHOT_MAGIC = b"BELELIDX1\n"
+
+class MemoryJournal:
+    """
+    Append-only journal backing the PermanentMemory index.
+    Each write appends one line to the journal; the full index is only rewritten
+    when the journal is compacted into the snapshot file. Appends and compaction
+    are serialized by a lock so they can run from worker threads.
+
+    A <snapshot_path>.snap left by an earlier version holds newer entries than
+    the JSON snapshot, so it is loaded instead until the next compaction replaces
+    it. One that cannot be read raises rather than falling back to the stale
+    JSON snapshot, whose journal has already been truncated.
+
+    Several processes may share one journal. Where fcntl is available, appends,
+    loads and compaction also take an advisory lock on <journal_path>.lock, and
+    read_tail() returns what other processes have appended since.
+    """
+    def __init__(self, snapshot_path: str, journal_path: str = None, compact_every: int = 10000):
+        self.snapshot_path = snapshot_path
+        self.legacy_snapshot_path = f"{snapshot_path}.snap"
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.compact_every = compact_every
+        self.pending_ops = 0
+        self._journal_file = None
+        self.lock = threading.RLock()
+        self.lock_path = f"{self.journal_path}.lock"
+        self._lock_file = None
+        self._lock_depth = 0
+        # Byte offset in the journal up to which this process has read, and the
+        # snapshot that offset belongs to.
+        self._read_offset = 0
+        self._snapshot_id = None
+
+    @contextmanager
+    def file_lock(self, exclusive: bool = True):
+        """
+        Holds self.lock plus the advisory lock shared with other processes.
+        Re-entrant; a nested call keeps the outermost call's mode.
+        """
+        with self.lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                if self._lock_file is None:
+                    self._lock_file = open(self.lock_path, "a")
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _snapshot_identity(self):
+        # Compaction replaces the snapshot file, so its inode and mtime change.
+        identity = []
+        for path in (self.legacy_snapshot_path, self.snapshot_path):
+            try:
+                stat = os.stat(path)
+                identity.append((stat.st_ino, stat.st_mtime_ns))
+            except FileNotFoundError:
+                identity.append(None)
+        return tuple(identity)
+
+    def load(self) -> dict:
+        """
+        Loads the last snapshot and replays the journal on top of it.
+        """
+        with self.file_lock(exclusive=False):
+            index = self.load_snapshot()
+            for entry_id, record in self.replay():
+                index[entry_id] = record
+        if self.pending_ops:
+            logging.info(f"Replayed {self.pending_ops} journal entries from {self.journal_path}")
+        return index
+
+    def exists(self) -> bool:
+        return any(os.path.exists(path) for path in (self.legacy_snapshot_path, self.snapshot_path, self.journal_path))
+
+    def load_snapshot(self) -> dict:
+        """
+        Returns the index from the last snapshot.
+        Hold file_lock() across this and replay() to see a consistent state.
+        """
+        self._snapshot_id = self._snapshot_identity()
+        if os.path.exists(self.legacy_snapshot_path):
+            return self._load_legacy_snapshot()
+        return self._load_json_snapshot()
+
+    def _load_legacy_snapshot(self) -> dict:
+        with open(self.legacy_snapshot_path, "rb") as f:
+            magic = f.read(len(LEGACY_SNAPSHOT_MAGIC))
+            if magic == PICKLE_SNAPSHOT_MAGIC:
+                raise ValueError(f"Refusing to load pickled snapshot {self.legacy_snapshot_path}")
+            if magic != LEGACY_SNAPSHOT_MAGIC:
+                raise ValueError(f"Unrecognized snapshot header in {self.legacy_snapshot_path}")
+            try:
+                return json.load(f)["index"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Unreadable snapshot {self.legacy_snapshot_path}: {e}") from e
+
+    def _load_json_snapshot(self) -> dict:
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    logging.warning("Corrupted memory log. Reinitializing.")
+                    return {}
+        else:
+            return {}
+
+    def replay(self):
+        """
+        Yields (entry_id, record) pairs from the journal in write order.
+        A torn line left by an interrupted write is skipped.
+        """
+        self.pending_ops = 0
+        self._read_offset = 0
+        yield from self._read_from_offset()
+
+    def _read_from_offset(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._read_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    logging.warning(f"Skipping torn journal entry in {self.journal_path}")
+                    break
+                self._read_offset += len(line)
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping torn journal entry in {self.journal_path}")
+                    continue
+                self.pending_ops += 1
+                yield op["id"], op["record"]
+
+    def read_tail(self):
+        """
+        Returns the (entry_id, record) pairs appended since this process last
+        loaded or read the journal, including its own. Returns None if another
+        process has compacted the journal in the meantime: the caller must then
+        reload from the snapshot.
+        """
+        with self.file_lock(exclusive=False):
+            if self._snapshot_identity() != self._snapshot_id:
+                return None
+            size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+            if size < self._read_offset:
+                return None
+            return list(self._read_from_offset())
+
+    def append(self, entry_id: str, record: dict):
+        self.append_many([(entry_id, record)])
+
+    def append_many(self, items: list[tuple[str, dict]]):
+        """
+        Appends several index records with a single write.
+        """
+        if not items:
+            return
+        data = "".join(json.dumps({"id": entry_id, "record": record}) + "\n" for entry_id, record in items).encode("utf-8")
+        with self.file_lock():
+            if self._journal_file is None:
+                self._journal_file = open(self.journal_path, "ab")
+            start = os.fstat(self._journal_file.fileno()).st_size
+            if start and self._last_byte() != b"\n":
+                # A crash left a torn line; terminate it so this write starts a fresh one.
+                data = b"\n" + data
+            self._journal_file.write(data)
+            self._journal_file.flush()
+            if self._read_offset == start:
+                # Nothing from other processes in between: no need to read this back.
+                self._read_offset = start + len(data)
+            self.pending_ops += len(items)
+
+    def _last_byte(self) -> bytes:
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1)
+
+    def should_compact(self) -> bool:
+        return self.pending_ops >= self.compact_every
+
+    def compact(self, index: dict):
+        """
+        Writes the full index as a new snapshot and truncates the journal. The
+        snapshot is replaced atomically, so a crash mid-compaction leaves the
+        previous snapshot and journal intact for replay.
+
+        The index is copied while holding the journal lock: any record missing from
+        the copy is appended only after the journal has been truncated, so it is
+        never lost. Returns the number of entries written.
+
+        Truncating the journal would drop entries other processes appended that
+        the index does not hold yet, so callers must apply read_tail() under the
+        same file_lock() first; otherwise this raises RuntimeError.
+        """
+        with self.file_lock():
+            if self.read_tail() != []:
+                raise RuntimeError(f"{self.journal_path} has entries not in the index; apply read_tail() before compacting")
+            index = index.copy()
+            self._write_snapshot(self.snapshot_path, index)
+            if os.path.exists(self.legacy_snapshot_path):
+                os.remove(self.legacy_snapshot_path)
+
+            self._close_journal_file()
+            open(self.journal_path, "w").close()
+            self.pending_ops = 0
+            self._read_offset = 0
+            self._snapshot_id = self._snapshot_identity()
+        logging.info(f"Memory journal compacted into {self.snapshot_path} ({len(index)} entries).")
+        return len(index)
+
+    def _write_snapshot(self, path: str, index: dict):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _close_journal_file(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def close(self):
+        with self.lock:
+            self._close_journal_file()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
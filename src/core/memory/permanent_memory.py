@@ -1,66 +1,343 @@
-<details>
-<summary>Click to expand full content</summary>
 # src/core/memory/permanent_memory.py 🧠💾
 
-import json
-import os
 import uuid
+import json
+import itertools
+import tempfile
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from hashlib import sha256
+from src.core.memory.content_cache import ContentCache
+from src.core.memory.memory_index_backend import MemoryIndexBackend, JournalIndexBackend
+from src.core.memory.provenance_graph import source_cids
 from src.protocol.decentralized_comm.ipfs_client import IPFSClient
+from src.protocol.decentralized_comm.async_ipfs_client import AsyncIPFSClient
+from src.protocol.decentralized_comm.ipfs_spool import IPFSSpool, SpoolFlusher
+from src.protocol.decentralized_comm.content_id import compute_cid, MAX_RAW_BLOCK_SIZE, RAW_CODEC
+from src.protocol.decentralized_comm.payload_codec import PayloadCodec, decode_payload
+from src.protocol.decentralized_comm.car_archive import (
+    CODEC_NAMES, CarWriter, CarReader, block_links, cid_codec, same_block, unixfs_content
+)
+from src.protocol.decentralized_comm.local_blob_store import LocalBlobStore
+from src.utils.cryptographic_utils import json_to_canonical_bytes, embed_canonical_bytes
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Index records of spooled memories point at this placeholder until they reach IPFS.
+SPOOL_ID_PREFIX = "local-"
+
 class PermanentMemory:
     """
     Decentralized memory module using IPFS for Belel Protocol.
     Each memory is cryptographically signed and permanently stored.
     """
-    def __init__(self, ipfs_client: IPFSClient, memory_log_path: str = "./memory_log.json"):
+    def __init__(self, ipfs_client: IPFSClient | AsyncIPFSClient, memory_log_path: str = "./memory_log.json", compact_every: int = 10000,
+                 cache_bytes: int = 64 * 1024 * 1024, max_concurrent_writes: int = 16,
+                 index_backend: MemoryIndexBackend = None, dedupe: bool = False, upload_batch_size: int = 64,
+                 spool: IPFSSpool = None, local_cids: bool = False, compression: PayloadCodec = None):
+        if local_cids and spool is None:
+            # A locally computed CID is acknowledged before the node has the payload;
+            # only the spool keeps it durable until the upload succeeds.
+            raise ValueError("local_cids requires a spool.")
         self.ipfs_client = ipfs_client
+        self.content_cache = ContentCache(cache_bytes)
+        self._write_slots = asyncio.Semaphore(max_concurrent_writes)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_writes + 1, thread_name_prefix="permanent-memory")
+        self._compacting = False
+        self.dedupe = dedupe
+        self.upload_batch_size = upload_batch_size
         self.memory_log_path = memory_log_path
-        self.memory_index = self._load_or_init_log()
+        self.spool = spool
+        self.local_cids = local_cids
+        self.compression = compression
+        self._flusher = SpoolFlusher(spool, self._upload_many, self._on_spool_flushed,
+                                     batch_size=upload_batch_size) if spool is not None else None
+        if index_backend is None:
+            index_backend = JournalIndexBackend(memory_log_path, compact_every)
+        self.memory_index = index_backend
         logging.info("PermanentMemory initialized.")
 
-    def _load_or_init_log(self):
-        if os.path.exists(self.memory_log_path):
-            with open(self.memory_log_path, "r") as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    logging.warning("Corrupted memory log. Reinitializing.")
-                    return {}
+    def compact_log(self):
+        """
+        Compacts the index backend (folds the journal into a fresh snapshot for the default backend).
+        """
+        self.memory_index.compact()
+
+    def refresh_index(self):
+        """
+        Picks up index entries written by other processes sharing this memory log.
+        """
+        self.memory_index.refresh()
+
+    async def load_index(self):
+        """
+        Loads a lazily loaded index on the worker pool, so the O(N) read (and any
+        wait for another process's compaction) stays off the event loop. The async
+        methods call this first; await it at startup to have the index warm before
+        the first store or query. Synchronous methods load on first use instead.
+        """
+        if not self.memory_index.loaded:
+            await self._run_blocking(self.memory_index.load)
+
+    def _wrap_memory(self, data: dict, context_tags: list[str], creator_id: str, data_bytes: bytes = None):
+        """
+        Wraps a payload for storage. data is serialized to canonical bytes once (or
+        data_bytes is used when the caller already holds them); the same buffer is
+        hashed for the integrity field and embedded verbatim in the uploaded bytes.
+        With compression configured, the uploaded bytes are compressed and tagged.
+        Returns (entry ID, wrapped memory, uploaded bytes, uncompressed length).
+        """
+        entry_id = str(uuid.uuid4())
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        if data_bytes is None:
+            data_bytes = json_to_canonical_bytes(data)
+        data_hash = sha256(data_bytes).hexdigest()
+        header = {
+            "id": entry_id,
+            "timestamp": timestamp,
+            "creator": creator_id,
+            "tags": context_tags,
+            "integrity": data_hash
+        }
+        wrapped_data = {**header, "data": data}
+        payload = embed_canonical_bytes(header, data=data_bytes)
+        size = len(payload)
+        if self.compression is not None:
+            payload = self.compression.encode(payload)
+        return entry_id, wrapped_data, payload, size
+
+    async def _run_blocking(self, func, *args):
+        """
+        Runs a blocking IPFS or disk call on the memory worker pool so the event loop stays free.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _commit_records(self, records: list[tuple[str, dict]]):
+        """
+        Writes records to the index backend (and compacts when due) in a worker thread.
+        """
+        await self._run_blocking(self.memory_index.put_many, records)
+        if self.memory_index.needs_compaction() and not self._compacting:
+            self._compacting = True
+            try:
+                await self._run_blocking(self.memory_index.compact)
+            finally:
+                self._compacting = False
+
+    async def _ipfs_call(self, method: str, *args):
+        """
+        Calls an IPFS client method: coroutine clients (AsyncIPFSClient) are awaited
+        directly, blocking ones run on the worker pool.
+        """
+        func = getattr(self.ipfs_client, method)
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await self._run_blocking(func, *args)
+
+    async def _upload(self, payload: bytes):
+        async with self._write_slots:
+            return await self._ipfs_call("add_bytes", payload)
+
+    async def _upload_many(self, payloads: list[bytes]) -> list[str]:
+        """
+        Uploads payloads, as multipart batches of upload_batch_size when the client
+        supports bulk adds (batches run concurrently), else one request per payload.
+        """
+        if len(payloads) < 2 or not hasattr(self.ipfs_client, "add_bytes_many"):
+            return list(await asyncio.gather(*(self._upload(payload) for payload in payloads)))
+
+        async def upload_batch(batch):
+            async with self._write_slots:
+                return await self._ipfs_call("add_bytes_many", batch)
+
+        size = self.upload_batch_size
+        batches = await asyncio.gather(*(upload_batch(payloads[i:i + size]) for i in range(0, len(payloads), size)))
+        return [cid for batch in batches for cid in batch]
+
+    async def _spool(self, items: list[tuple[str, bytes]]) -> list[str]:
+        """
+        Persists payloads to the spool and returns their local IDs. They are
+        published to the background flusher, which uploads them and swaps in the
+        real CIDs, only once their index records are committed.
+        """
+        spooled = [(f"{SPOOL_ID_PREFIX}{entry_id}", payload) for entry_id, payload in items]
+        await self._run_blocking(self.spool.put_many, spooled, False)
+        return [local_id for local_id, _ in spooled]
+
+    async def _on_spool_flushed(self, flushed: list[tuple[str, str]]) -> list[str]:
+        """
+        Points index records at the CIDs of uploaded payloads. Returns the local IDs
+        that no longer need their spool file; a payload whose record cannot be
+        found stays spooled.
+        """
+        await self.load_index()
+        updated = []
+        mismatched = []
+        recorded = []
+        for local_id, cid in flushed:
+            if not local_id.startswith(SPOOL_ID_PREFIX):
+                # Spooled under a locally computed CID: only a disagreeing node needs an index update.
+                if cid != local_id:
+                    mismatched.append((local_id, cid))
+                else:
+                    recorded.append(local_id)
+                continue
+            entry_id = local_id[len(SPOOL_ID_PREFIX):]
+            record = self.memory_index.get(entry_id)
+            if record is None:
+                continue
+            if record["cid"] == local_id:
+                updated.append((entry_id, {**record, "cid": cid, "replaces_cid": local_id}))
+            recorded.append(local_id)
+            memory = self.content_cache.get(local_id)
+            if memory is not None:
+                self.content_cache.put(cid, memory)
+        await self._commit_records(updated)
+        recorded += await self._replace_cids(mismatched)
+        logging.info(f"Flushed {len(recorded)} spooled memories to IPFS.")
+        if len(recorded) < len(flushed):
+            logging.warning(f"{len(flushed) - len(recorded)} uploaded memories have no index record yet; kept spooled.")
+        return recorded
+
+    async def _store_with_local_cids(self, items: list[tuple[str, bytes]]) -> list[str]:
+        """
+        Computes CIDs locally so entries can be indexed before the node answers.
+        The payloads are spooled under those CIDs and cross-checked against the
+        node's CIDs when the flusher uploads them. Payloads the node would split
+        into several blocks cannot be addressed locally and are spooled under
+        local IDs instead.
+        """
+        cids = [compute_cid(payload) if len(payload) <= MAX_RAW_BLOCK_SIZE else None for _, payload in items]
+        large = [position for position, cid in enumerate(cids) if cid is None]
+        if large:
+            large_cids = await self._spool([items[position] for position in large])
+            for position, cid in zip(large, large_cids):
+                cids[position] = cid
+        local = [(cid, payload) for position, (cid, (_, payload)) in enumerate(zip(cids, items))
+                 if position not in large]
+        if local:
+            await self._run_blocking(self.spool.put_many, local, False)
+        return cids
+
+    async def _replace_cids(self, replacements: list[tuple[str, str]]) -> list[str]:
+        """
+        Points index entries at the CIDs the node actually returned. The records
+        name the CID they replace, so the backend re-keys their provenance edges.
+        Returns the replaced CIDs that were found in the index.
+        """
+        if not replacements:
+            return []
+        replacements = dict(replacements)
+        for local_cid, node_cid in replacements.items():
+            logging.warning(f"IPFS returned CID {node_cid} for locally computed {local_cid}. Updating index.")
+            memory = self.content_cache.get(local_cid)
+            if memory is not None:
+                self.content_cache.put(node_cid, memory)
+
+        def find_entries():
+            return [(entry_id, {**record, "cid": replacements[record["cid"]], "replaces_cid": record["cid"]})
+                    for entry_id, record in self.memory_index.items() if record["cid"] in replacements]
+
+        entries = await self._run_blocking(find_entries)
+        await self._commit_records(entries)
+        return list({record["replaces_cid"] for _, record in entries})
+
+    async def flush_spool(self) -> int:
+        """
+        Uploads spooled memories now. Returns the number flushed.
+        """
+        if self._flusher is None:
+            return 0
+        return await self._flusher.flush()
+
+    async def stop_flusher(self):
+        if self._flusher is not None:
+            await self._flusher.stop()
+
+    def _build_record(self, wrapped_data: dict, cid: str, duplicate_of: str = None) -> dict:
+        record = {
+            "cid": cid,
+            "tags": wrapped_data["tags"],
+            "creator": wrapped_data["creator"],
+            "timestamp": wrapped_data["timestamp"],
+            "integrity": wrapped_data["integrity"]
+        }
+        parents = source_cids(wrapped_data["data"])
+        if parents:
+            record["parents"] = parents
+        if duplicate_of:
+            record["duplicate_of"] = duplicate_of
+        return record
+
+    async def _store_wrapped(self, wrapped: list[tuple[str, dict, bytes, int]]) -> list[tuple]:
+        """
+        Uploads and indexes wrapped memories with a single index commit.
+        With a spool, payloads are written to disk instead and acknowledged with
+        local IDs; the background flusher uploads them. With local_cids, entries
+        are acknowledged with CIDs computed from the payload bytes.
+        With dedupe enabled, a payload whose integrity hash is already stored (or
+        repeated within the batch) is not uploaded again: it is indexed as a
+        reference record pointing at the original entry's CID.
+        """
+        await self.load_index()
+        stored = {}
+        if self.dedupe:
+            for integrity in {wrapped_data["integrity"] for _, wrapped_data, _, _ in wrapped}:
+                original_id = self.memory_index.entry_for_integrity(integrity)
+                if original_id is not None:
+                    stored[integrity] = (original_id, self.memory_index[original_id]["cid"])
+
+        def key(position, wrapped_data):
+            return wrapped_data["integrity"] if self.dedupe else position
+
+        uploads = {}
+        for position, (_, wrapped_data, _, _) in enumerate(wrapped):
+            upload_key = key(position, wrapped_data)
+            if upload_key not in stored and upload_key not in uploads:
+                uploads[upload_key] = position
+        pending = [(wrapped[position][0], wrapped[position][2]) for position in uploads.values()]
+        if self.local_cids:
+            cids = await self._store_with_local_cids(pending)
+        elif self.spool is not None:
+            cids = await self._spool(pending)
         else:
-            return {}
+            cids = await self._upload_many([payload for _, payload in pending])
+        for (upload_key, position), cid in zip(uploads.items(), cids):
+            if cid:
+                entry_id, wrapped_data, _, size = wrapped[position]
+                stored[upload_key] = (entry_id, cid)
+                # Charged at the decoded size: the cache holds the memory, not the compressed upload.
+                self.content_cache.put(cid, wrapped_data, size=size)
 
-    def _store_log(self):
-        with open(self.memory_log_path, "w") as f:
-            json.dump(self.memory_index, f, indent=2)
+        results = []
+        committed = []
+        for position, (entry_id, wrapped_data, _, _) in enumerate(wrapped):
+            original = stored.get(key(position, wrapped_data))
+            if original is None:
+                results.append((None, None))
+                continue
+            original_id, cid = original
+            duplicate_of = original_id if original_id != entry_id else None
+            committed.append((entry_id, self._build_record(wrapped_data, cid, duplicate_of)))
+            results.append((entry_id, cid))
+        await self._commit_records(committed)
+        if self._flusher is not None and uploads:
+            # Only now can the flusher find the records it has to re-point.
+            self.spool.publish([cid for cid in cids if cid])
+            self._flusher.notify()
+        return results
 
-    async def store_memory(self, data: dict, context_tags: list[str], creator_id: str):
+    async def store_memory(self, data: dict, context_tags: list[str], creator_id: str, data_bytes: bytes = None):
+        """
+        Stores one memory. Callers that already hold the canonical encoding of data
+        (e.g. after signing it) can pass it as data_bytes to skip re-serialization.
+        """
         try:
-            entry_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat() + "Z"
-            data_hash = sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
-            wrapped_data = {
-                "id": entry_id,
-                "timestamp": timestamp,
-                "creator": creator_id,
-                "tags": context_tags,
-                "data": data,
-                "integrity": data_hash
-            }
-
-            cid = self.ipfs_client.add_json(wrapped_data)
+            wrapped = self._wrap_memory(data, context_tags, creator_id, data_bytes)
+            entry_id, cid = (await self._store_wrapped([wrapped]))[0]
             if cid:
-                self.memory_index[entry_id] = {
-                    "cid": cid,
-                    "tags": context_tags,
-                    "creator": creator_id,
-                    "timestamp": timestamp
-                }
-                self._store_log()
                 logging.info(f"Memory stored: {entry_id} → CID {cid}")
                 return entry_id, cid
             else:
@@ -70,94 +347,368 @@ class PermanentMemory:
             logging.error(f"Error storing memory: {e}")
             return None, None
 
+    async def store_memory_many(self, records: list[dict]) -> list[tuple]:
+        """
+        Stores a batch of memories. Each record holds the store_memory arguments
+        (data, context_tags, creator_id and optionally data_bytes). Uploads run concurrently and the index
+        is committed with a single journal write for the whole batch.
+        Returns (entry_id, cid) per record, in order; failed uploads yield (None, None).
+        """
+        try:
+            wrapped = [
+                self._wrap_memory(r["data"], r["context_tags"], r["creator_id"], r.get("data_bytes")) for r in records
+            ]
+            results = await self._store_wrapped(wrapped)
+        except Exception as e:
+            logging.error(f"Error storing memory batch: {e}")
+            return [(None, None)] * len(records)
+
+        failed = sum(1 for _, cid in results if not cid)
+        if failed:
+            logging.error(f"Failed to store {failed} of {len(records)} memories in IPFS.")
+        logging.info(f"Memory batch stored: {len(records) - failed} entries.")
+        return results
+
+    def _read_spooled(self, cid: str):
+        """
+        Returns a memory still waiting in the spool, or None.
+        """
+        data = self.spool.get(cid)
+        if data is None:
+            return None
+        raw = decode_payload(data)
+        memory = json.loads(raw)
+        self.content_cache.put(cid, memory, size=len(raw))
+        return memory
+
+    def _flushed_cid(self, local_id: str):
+        # A local ID whose spool file is gone has been flushed: its entry now holds the real CID.
+        record = self.memory_index.get(local_id[len(SPOOL_ID_PREFIX):])
+        if record is None or record["cid"] == local_id:
+            logging.error(f"Spooled memory {local_id} is missing.")
+            return None
+        return record["cid"]
+
+    def _fetch_by_cid(self, cid: str):
+        memory = self.content_cache.get(cid)
+        if memory is None and self.spool is not None:
+            memory = self._read_spooled(cid)
+            if memory is None and cid.startswith(SPOOL_ID_PREFIX):
+                flushed_cid = self._flushed_cid(cid)
+                return self._fetch_by_cid(flushed_cid) if flushed_cid else None
+        if memory is None:
+            memory = self._cat_and_cache(cid)
+        return memory
+
+    def _cat_and_cache(self, cid: str):
+        if asyncio.iscoroutinefunction(self.ipfs_client.cat_json):
+            logging.error(f"Cannot fetch CID {cid} synchronously with an async IPFS client. Use retrieve_memory_by_cid.")
+            return None
+        memory = self.ipfs_client.cat_json(cid)
+        if memory is not None:
+            self.content_cache.put(cid, memory)
+        return memory
+
     def retrieve_memory(self, entry_id: str):
         if entry_id in self.memory_index:
             cid = self.memory_index[entry_id]["cid"]
-            return self.ipfs_client.cat_json(cid)
+            return self._fetch_by_cid(cid)
         else:
             logging.warning(f"Memory ID {entry_id} not found.")
             return None
 
+    async def retrieve_memory_by_cid(self, cid: str):
+        memory = self.content_cache.get(cid)
+        if memory is not None:
+            return memory
+        if self.spool is not None:
+            memory = await self._run_blocking(self._read_spooled, cid)
+            if memory is not None:
+                return memory
+            if cid.startswith(SPOOL_ID_PREFIX):
+                await self.load_index()
+                flushed_cid = self._flushed_cid(cid)
+                return await self.retrieve_memory_by_cid(flushed_cid) if flushed_cid else None
+        if asyncio.iscoroutinefunction(self.ipfs_client.cat_json):
+            memory = await self.ipfs_client.cat_json(cid)
+            if memory is not None:
+                self.content_cache.put(cid, memory)
+            return memory
+        return await self._run_blocking(self._cat_and_cache, cid)
+
+    async def _retrieve_entries(self, entry_ids) -> list[dict]:
+        await self.load_index()
+        entries = self.memory_index.get_many(entry_ids)
+        memories = await asyncio.gather(*(self.retrieve_memory_by_cid(entry["cid"]) for entry in entries.values()))
+        return [memory for memory in memories if memory]
+
+    async def retrieve_memories_by_cid(self, cids: list[str]) -> list[dict]:
+        """
+        Fetches several payloads concurrently. Returns them in the order of cids,
+        skipping any that could not be retrieved.
+        """
+        memories = await asyncio.gather(*(self.retrieve_memory_by_cid(cid) for cid in cids))
+        return [memory for memory in memories if memory]
+
+    def ancestors(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        """
+        Returns the CIDs this memory was derived from via its source_*_cid fields,
+        nearest first, resolved from the local provenance index.
+        """
+        return self.memory_index.ancestor_cids(cid, depth, via)
+
+    def descendants(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        """
+        Returns the CIDs of memories derived from this one, nearest first.
+        """
+        return self.memory_index.descendant_cids(cid, depth, via)
+
+    async def trace_provenance(self, cid: str, depth: int = None, via: str = None,
+                               descendants: bool = False) -> list[dict]:
+        """
+        Returns the payload of cid followed by those of its ancestors (or descendants),
+        nearest first. The graph walk is local and the payloads are prefetched together.
+        """
+        await self.load_index()
+        related = self.descendants(cid, depth, via) if descendants else self.ancestors(cid, depth, via)
+        return await self.retrieve_memories_by_cid([cid] + related)
+
+    def cache_stats(self) -> dict:
+        """
+        Returns hit/miss counters and byte usage of the payload cache.
+        """
+        return self.content_cache.stats()
+
     def search_by_tag(self, tag: str):
-        return {k: v for k, v in self.memory_index.items() if tag in v["tags"]}
-      # src/core/memory/permanent_memory.py 🧠💾
+        return self.search_by_tags([tag])
 
-import json
-import os
-import uuid
-import logging
-from datetime import datetime
-from hashlib import sha256
-from src.protocol.decentralized_comm.ipfs_client import IPFSClient
+    def search_by_tags(self, tags: list[str], match_all: bool = True):
+        """
+        Returns index entries carrying all (match_all=True) or any of the given tags.
+        """
+        return self.memory_index.get_many(self.memory_index.ids_for_tags(tags, match_all))
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    async def query_memory_by_tags(self, tags: list[str], match_all: bool = True) -> list[dict]:
+        await self.load_index()
+        return await self._retrieve_entries(self.memory_index.ids_for_tags(tags, match_all))
 
-class PermanentMemory:
-    """
-    Decentralized memory module using IPFS for Belel Protocol.
-    Each memory is cryptographically signed and permanently stored.
-    """
-    def __init__(self, ipfs_client: IPFSClient, memory_log_path: str = "./memory_log.json"):
-        self.ipfs_client = ipfs_client
-        self.memory_log_path = memory_log_path
-        self.memory_index = self._load_or_init_log()
-        logging.info("PermanentMemory initialized.")
+    def search_by_time_range(self, start_time=None, end_time=None, offset: int = 0, limit: int = None):
+        """
+        Returns index entries stored between start_time and end_time (inclusive), oldest first.
+        """
+        return self.memory_index.get_many(self.memory_index.ids_in_time_range(start_time, end_time, offset, limit))
 
-    def _load_or_init_log(self):
-        if os.path.exists(self.memory_log_path):
-            with open(self.memory_log_path, "r") as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    logging.warning("Corrupted memory log. Reinitializing.")
-                    return {}
-        else:
-            return {}
+    def iter_by_time_range(self, start_time=None, end_time=None, page_size: int = 500):
+        """
+        Yields index entries of a time window page by page, so large windows can be
+        walked without materializing them at once.
+        """
+        for page in self.memory_index.iter_time_pages(start_time, end_time, page_size):
+            yield self.memory_index.get_many(page)
 
-    def _store_log(self):
-        with open(self.memory_log_path, "w") as f:
-            json.dump(self.memory_index, f, indent=2)
+    async def query_memory_by_time_range(self, start_time: str, end_time: str) -> list[dict]:
+        await self.load_index()
+        return await self._retrieve_entries(self.memory_index.ids_in_time_range(start_time, end_time))
 
-    async def store_memory(self, data: dict, context_tags: list[str], creator_id: str):
-        try:
-            entry_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat() + "Z"
-            data_hash = sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
-            wrapped_data = {
-                "id": entry_id,
-                "timestamp": timestamp,
-                "creator": creator_id,
-                "tags": context_tags,
-                "data": data,
-                "integrity": data_hash
-            }
-
-            cid = self.ipfs_client.add_json(wrapped_data)
-            if cid:
-                self.memory_index[entry_id] = {
-                    "cid": cid,
-                    "tags": context_tags,
-                    "creator": creator_id,
-                    "timestamp": timestamp
-                }
-                self._store_log()
-                logging.info(f"Memory stored: {entry_id} → CID {cid}")
-                return entry_id, cid
-            else:
-                logging.error("Failed to store memory in IPFS.")
-                return None, None
-        except Exception as e:
-            logging.error(f"Error storing memory: {e}")
-            return None, None
+    def _iter_selected(self, tags: list[str] = None, creator: str = None, start_time=None, end_time=None,
+                       page_size: int = 500):
+        """
+        Yields pages of (entry_id, record) for entries carrying all of tags, written by
+        creator and stored between start_time and end_time, oldest first.
+        """
+        tags = set(tags or [])
+        for page in self.iter_by_time_range(start_time, end_time, page_size):
+            yield [
+                (entry_id, record) for entry_id, record in page.items()
+                if (not tags or tags.issubset(record["tags"])) and (creator is None or record.get("creator") == creator)
+            ]
 
-    def retrieve_memory(self, entry_id: str):
-        if entry_id in self.memory_index:
-            cid = self.memory_index[entry_id]["cid"]
-            return self.ipfs_client.cat_json(cid)
-        else:
-            logging.warning(f"Memory ID {entry_id} not found.")
+    def export_index(self, tags: list[str] = None, creator: str = None, start_time=None, end_time=None,
+                     page_size: int = 500):
+        """
+        Streams index entries as NDJSON lines ({"id", "record"}), oldest first.
+        Only entries carrying all of tags, written by creator and stored between
+        start_time and end_time are exported. Memory use is bounded by page_size.
+        """
+        for page in self._iter_selected(tags, creator, start_time, end_time, page_size):
+            for entry_id, record in page:
+                yield json.dumps({"id": entry_id, "record": record}) + "\n"
+
+    def import_index(self, lines, batch_size: int = 1000) -> int:
+        """
+        Merges NDJSON index lines (as produced by export_index) into the index in
+        batches. Existing entries with the same ID are overwritten, so re-importing
+        a delta is harmless. Malformed lines are skipped. Returns the number imported.
+        """
+        imported = 0
+        batch = []
+        for line_number, line in enumerate(lines, 1):
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            try:
+                op = json.loads(line)
+                record = op["record"]
+                if not all(field in record for field in ("cid", "tags", "timestamp")):
+                    raise ValueError("incomplete index record")
+                batch.append((op["id"], record))
+            except (ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Skipping malformed index line {line_number}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                self.memory_index.put_many(batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            self.memory_index.put_many(batch)
+            imported += len(batch)
+        if self.memory_index.needs_compaction():
+            self.compact_log()
+        logging.info(f"Imported {imported} memory index entries.")
+        return imported
+
+    async def _payload_bytes(self, cid: str):
+        """
+        Returns the stored bytes of a payload, from the spool while it is pending.
+        """
+        if self.spool is not None:
+            data = await self._run_blocking(self.spool.get, cid)
+            if data is not None:
+                return data
+        async with self._write_slots:
+            return await self._ipfs_call("cat_bytes", cid)
+
+    async def _block(self, cid: str):
+        async with self._write_slots:
+            return await self._ipfs_call("block_get", cid)
+
+    async def _payload_blocks(self, cid: str):
+        """
+        Returns the blocks of a stored payload, root first, or None if any is missing.
+        A raw CID is a single block holding the payload itself (possibly still in the
+        spool); a dag-pb CID is walked through the node's block API.
+        """
+        if cid_codec(cid) == RAW_CODEC:
+            data = await self._payload_bytes(cid)
+            return None if data is None else [(cid, data)]
+        if not hasattr(self.ipfs_client, "block_get"):
+            logging.error(f"Cannot export multi-block payload {cid}: the IPFS client has no block API.")
             return None
+        blocks = []
+        seen = {cid}
+        level = [cid]
+        while level:
+            fetched = await asyncio.gather(*(self._block(block_cid) for block_cid in level))
+            next_level = []
+            for block_cid, data in zip(level, fetched):
+                if data is None:
+                    return None
+                blocks.append((block_cid, data))
+                for link in block_links(block_cid, data):
+                    if link not in seen:
+                        seen.add(link)
+                        next_level.append(link)
+            level = next_level
+        return blocks
 
-    def search_by_tag(self, tag: str):
-        return {k: v for k, v in self.memory_index.items() if tag in v["tags"]}
-      </details>
+    async def export_car(self, path: str, tags: list[str] = None, creator: str = None, start_time=None,
+                         end_time=None, page_size: int = 500) -> int:
+        """
+        Writes the blocks of the selected memories' payloads (see export_index) into
+        one CAR archive, fetching each page concurrently and streaming it to disk.
+        Payloads the node stored as a DAG (CIDv0 entries, or payloads larger than one
+        block) are exported block by block with all their leaves. Pair it with
+        export_index to replicate the index entries as well. Returns the number of blocks.
+        """
+        await self.load_index()
+        selected = [
+            record["cid"] for page in self._iter_selected(tags, creator, start_time, end_time, page_size)
+            for _, record in page
+        ]
+        roots = [cid for cid in dict.fromkeys(selected) if not cid.startswith(SPOOL_ID_PREFIX)]
+        writer = await self._run_blocking(CarWriter, path, roots)
+        written = set()
+        try:
+            for start in range(0, len(roots), page_size):
+                page = roots[start:start + page_size]
+                payloads = await asyncio.gather(*(self._payload_blocks(cid) for cid in page))
+                missing = [cid for cid, blocks in zip(page, payloads) if blocks is None]
+                if missing:
+                    logging.error(f"Skipping {len(missing)} payloads that could not be fetched for CAR export.")
+
+                def write_page():
+                    for blocks in payloads:
+                        for cid, data in blocks or ():
+                            if cid not in written:
+                                written.add(cid)
+                                writer.write_block(cid, data)
+
+                await self._run_blocking(write_page)
+        finally:
+            await self._run_blocking(writer.close)
+        logging.info(f"Exported {writer.blocks} blocks of {len(roots)} memory payloads to {path}")
+        return writer.blocks
+
+    async def _put_block(self, cid: str, data: bytes):
+        codec = CODEC_NAMES.get(cid_codec(cid))
+        async with self._write_slots:
+            if hasattr(self.ipfs_client, "block_put") and codec is not None:
+                return await self._ipfs_call("block_put", data, codec)
+            if codec == "raw":
+                return await self._ipfs_call("add_bytes", data)
+        logging.error(f"Cannot import block {cid}: the IPFS client has no block API for it.")
+        return None
+
+    async def import_car(self, path: str, blob_store: LocalBlobStore = None, batch_size: int = 256) -> int:
+        """
+        Loads the blocks of a CAR archive into blob_store or, without one, stores them
+        verbatim on the IPFS node. Blocks are verified against their CIDs while
+        streaming, and a block the node stores under a different CID is counted as
+        failed. The blob store keeps file content by CID, so multi-block payloads are
+        reassembled there from their DAG. Returns the number of blocks imported.
+        """
+        reader = await self._run_blocking(CarReader, path)
+        imported = 0
+        # DAG nodes are staged until their payloads can be reassembled.
+        staging_dir = tempfile.TemporaryDirectory(prefix="car-import-") if blob_store is not None else None
+        staging = LocalBlobStore(staging_dir.name) if staging_dir is not None else None
+        try:
+            blocks = iter(reader)
+            while True:
+                batch = await self._run_blocking(lambda: list(itertools.islice(blocks, batch_size)))
+                if not batch:
+                    break
+                if blob_store is not None:
+                    def store_batch():
+                        for cid, data in batch:
+                            (blob_store if cid_codec(cid) == RAW_CODEC else staging).put_bytes(cid, data)
+                    await self._run_blocking(store_batch)
+                    imported += len(batch)
+                    continue
+                node_cids = await asyncio.gather(*(self._put_block(cid, data) for cid, data in batch))
+                for (cid, _), node_cid in zip(batch, node_cids):
+                    if node_cid is None:
+                        logging.error(f"Failed to import block {cid} into IPFS.")
+                    elif not same_block(cid, node_cid):
+                        logging.error(f"IPFS stored archived block {cid} as {node_cid}; not counted as imported.")
+                    else:
+                        imported += 1
+            if blob_store is not None:
+                def reassemble():
+                    def get_block(cid):
+                        return (blob_store if cid_codec(cid) == RAW_CODEC else staging).get_bytes(cid)
+                    for root in reader.roots:
+                        if cid_codec(root) == RAW_CODEC:
+                            continue
+                        try:
+                            blob_store.put_bytes(root, unixfs_content(root, get_block))
+                        except ValueError as e:
+                            logging.error(f"Cannot reassemble payload {root} from {path}: {e}")
+                await self._run_blocking(reassemble)
+        finally:
+            await self._run_blocking(reader.close)
+            if staging_dir is not None:
+                staging_dir.cleanup()
+        logging.info(f"Imported {imported} blocks from {path}")
+        return imported
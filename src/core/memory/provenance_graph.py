@@ -0,0 +1,132 @@
+# src/core/memory/provenance_graph.py 🧠🧬
+
+def _is_source_field(key) -> bool:
+    return isinstance(key, str) and key.startswith("source_") and (key.endswith("_cid") or key.endswith("_cids"))
+
+def _is_cid(value) -> bool:
+    return isinstance(value, str) and bool(value) and value != "N/A"
+
+def source_cids(data) -> dict[str, list[str]]:
+    """
+    Collects the CIDs a memory payload derives from: the values of every
+    source_*_cid / source_*_cids field found anywhere in data, grouped by field
+    name in first-seen order. Placeholders such as "N/A" are ignored.
+    """
+    found: dict[str, list[str]] = {}
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if _is_source_field(key):
+                    items = item if isinstance(item, (list, tuple)) else [item]
+                    cids = found.setdefault(key, [])
+                    cids.extend(cid for cid in items if _is_cid(cid) and cid not in cids)
+                elif isinstance(item, (dict, list, tuple)):
+                    stack.append(item)
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+    return {field: cids for field, cids in found.items() if cids}
+
+class ProvenanceGraph:
+    """
+    Parent/child edges between memory CIDs, labelled with the source field they came from.
+    A CID's parents are part of its content, so edges never change once added and
+    ancestry or descendant walks need no network fetches. The one exception is a
+    memory acknowledged under a placeholder (a spool ID or a locally computed
+    CID) and later given its real CID: replace_cid re-keys its edges, and the
+    placeholder stays an alias so payloads that cite it still link up.
+    """
+    def __init__(self):
+        self.parents: dict[str, list[tuple[str, str]]] = {}
+        self.children: dict[str, list[tuple[str, str]]] = {}
+        self.aliases: dict[str, str] = {}
+
+    @classmethod
+    def build(cls, memory_index: dict) -> "ProvenanceGraph":
+        graph = cls()
+        for record in memory_index.values():
+            graph.add_record(record)
+        return graph
+
+    def add_record(self, record: dict):
+        """
+        Adds an index record's edges, first re-keying the CID it replaces, if any.
+        """
+        if record.get("replaces_cid"):
+            self.replace_cid(record["replaces_cid"], record["cid"])
+        self.add(record["cid"], record.get("parents", {}))
+
+    def add(self, cid: str, parents: dict[str, list[str]]):
+        if not parents or cid in self.parents:
+            return
+        edges = [(field, self.resolve(parent)) for field, cids in parents.items() for parent in cids]
+        self.parents[cid] = edges
+        for field, parent in edges:
+            self.children.setdefault(parent, []).append((field, cid))
+
+    def resolve(self, cid: str) -> str:
+        """
+        Follows aliases from a replaced CID to the CID it now goes by.
+        """
+        seen = {cid}
+        while cid in self.aliases and self.aliases[cid] not in seen:
+            cid = self.aliases[cid]
+            seen.add(cid)
+        return cid
+
+    def replace_cid(self, old_cid: str, new_cid: str):
+        """
+        Moves every edge of old_cid to new_cid. Idempotent.
+        """
+        if old_cid == new_cid:
+            return
+        self.aliases[old_cid] = new_cid
+        parent_edges = self.parents.pop(old_cid, [])
+        for field, parent in parent_edges:
+            self._replace_edge(self.children, parent, (field, old_cid), (field, new_cid))
+        if parent_edges:
+            self.parents.setdefault(new_cid, parent_edges)
+        child_edges = self.children.pop(old_cid, [])
+        for field, child in child_edges:
+            self._replace_edge(self.parents, child, (field, old_cid), (field, new_cid))
+        if child_edges:
+            edges = self.children.setdefault(new_cid, [])
+            edges.extend(edge for edge in child_edges if edge not in edges)
+
+    @staticmethod
+    def _replace_edge(edges: dict, cid: str, old_edge: tuple, new_edge: tuple):
+        current = edges.get(cid)
+        if not current or old_edge not in current:
+            return
+        if new_edge in current:
+            current.remove(old_edge)
+        else:
+            current[current.index(old_edge)] = new_edge
+
+    def _walk(self, cid: str, edges: dict, depth: int = None, via: str = None) -> list[str]:
+        """
+        Breadth-first walk from cid (excluded), nearest first, at most depth hops.
+        Only edges from the via field are followed when given.
+        """
+        seen = {cid}
+        order = []
+        frontier = [cid]
+        hops = 0
+        while frontier and (depth is None or hops < depth):
+            hops += 1
+            next_frontier = []
+            for current in frontier:
+                for field, neighbour in edges.get(current, ()):
+                    if (via is None or field == via) and neighbour not in seen:
+                        seen.add(neighbour)
+                        order.append(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return order
+
+    def ancestors(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        return self._walk(self.resolve(cid), self.parents, depth, via)
+
+    def descendants(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        return self._walk(self.resolve(cid), self.children, depth, via)
@@ -0,0 +1,255 @@
+# src/core/memory/sqlite_index_backend.py 🧠🗄️
+
+import json
+import sqlite3
+import logging
+import threading
+from src.core.memory.memory_index_backend import MemoryIndexBackend
+from src.core.memory.memory_journal import MemoryJournal
+from src.core.memory.time_index import timestamp_key
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    entry_id TEXT PRIMARY KEY,
+    cid TEXT NOT NULL,
+    creator TEXT,
+    timestamp TEXT NOT NULL,
+    ts REAL NOT NULL,
+    record TEXT NOT NULL,
+    integrity TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_memories_cid ON memories(cid);
+CREATE INDEX IF NOT EXISTS idx_memories_creator ON memories(creator, ts);
+CREATE INDEX IF NOT EXISTS idx_memories_ts ON memories(ts, entry_id);
+CREATE TABLE IF NOT EXISTS memory_tags (
+    tag TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    PRIMARY KEY (tag, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_memory_tags_entry ON memory_tags(entry_id);
+CREATE TABLE IF NOT EXISTS memory_edges (
+    child_cid TEXT NOT NULL,
+    field TEXT NOT NULL,
+    parent_cid TEXT NOT NULL,
+    PRIMARY KEY (child_cid, field, parent_cid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_memory_edges_parent ON memory_edges(parent_cid);
+CREATE TABLE IF NOT EXISTS cid_aliases (
+    old_cid TEXT PRIMARY KEY,
+    cid TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cid_aliases_cid ON cid_aliases(cid);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Bounds recursive provenance walks when no depth is given.
+MAX_PROVENANCE_DEPTH = 1000
+
+class SQLiteIndexBackend(MemoryIndexBackend):
+    """
+    PermanentMemory index stored in an embedded SQLite database.
+    Nothing is loaded into RAM at startup; entry ID, CID, creator, timestamp and
+    tags are indexed so lookups and range queries stay fast at millions of memories.
+    The full index record is kept as JSON so new record fields need no schema change.
+    """
+    def __init__(self, db_path: str = "./memory_index.db", migrate_from: str = None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self.conn.commit()
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+    def _upgrade_schema(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(memories)")}
+        if "integrity" not in columns:
+            self.conn.execute("ALTER TABLE memories ADD COLUMN integrity TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_integrity ON memories(integrity)")
+
+    def migrate_from_json(self, memory_log_path: str) -> int:
+        """
+        One-shot import of an existing memory_log.json snapshot and its journal.
+        Does nothing if this database has already been migrated. The JSON files
+        are left in place. Returns the number of migrated entries.
+        """
+        with self._lock:
+            done = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+        if done:
+            return 0
+        journal = MemoryJournal(memory_log_path)
+        if not journal.exists():
+            return 0
+
+        records = journal.load()
+        self.put_many(list(records.items()))
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (memory_log_path,))
+        logging.info(f"Migrated {len(records)} memory index entries from {memory_log_path} to {self.db_path}")
+        return len(records)
+
+    def __getitem__(self, entry_id: str) -> dict:
+        with self._lock:
+            row = self.conn.execute("SELECT record FROM memories WHERE entry_id = ?", (entry_id,)).fetchone()
+        if row is None:
+            raise KeyError(entry_id)
+        return json.loads(row[0])
+
+    def __contains__(self, entry_id) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM memories WHERE entry_id = ?", (entry_id,)).fetchone() is not None
+
+    def __iter__(self):
+        for entry_id, _ in self.items():
+            yield entry_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def items(self, batch_size: int = 1000):
+        """
+        Streams (entry_id, record) pairs in time order using keyset pagination.
+        """
+        last = (float("-inf"), "")
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT entry_id, record, ts FROM memories WHERE (ts, entry_id) > (?, ?) "
+                    "ORDER BY ts, entry_id LIMIT ?",
+                    (last[0], last[1], batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for entry_id, record, _ in rows:
+                yield entry_id, json.loads(record)
+            last = (rows[-1][2], rows[-1][0])
+
+    def get_many(self, entry_ids) -> dict:
+        entry_ids = list(entry_ids)
+        found = {}
+        for start in range(0, len(entry_ids), 500):
+            chunk = entry_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT entry_id, record FROM memories WHERE entry_id IN ({placeholders})", chunk
+                ).fetchall()
+            found.update((entry_id, json.loads(record)) for entry_id, record in rows)
+        return {entry_id: found[entry_id] for entry_id in entry_ids if entry_id in found}
+
+    def put_many(self, records: list[tuple[str, dict]]):
+        if not records:
+            return
+        rows = [
+            (entry_id, record["cid"], record.get("creator"), record["timestamp"],
+             timestamp_key(record["timestamp"]), json.dumps(record),
+             None if "duplicate_of" in record else record.get("integrity"))
+            for entry_id, record in records
+        ]
+        tags = [(tag, entry_id) for entry_id, record in records for tag in record["tags"]]
+        edges = [
+            (record["cid"], field, parent, parent)
+            for _, record in records for field, parents in record.get("parents", {}).items() for parent in parents
+        ]
+        # A memory acknowledged under a placeholder CID keeps its edges when it gets its real one.
+        replaced = [(record["cid"], record["replaces_cid"]) for _, record in records
+                    if record.get("replaces_cid") and record["replaces_cid"] != record["cid"]]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM memory_tags WHERE entry_id = ?", [(entry_id,) for entry_id, _ in records]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO memories (entry_id, cid, creator, timestamp, ts, record, integrity) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.executemany("INSERT OR IGNORE INTO memory_tags (tag, entry_id) VALUES (?, ?)", tags)
+            self.conn.executemany("UPDATE cid_aliases SET cid = ? WHERE cid = ?", replaced)
+            self.conn.executemany("INSERT OR REPLACE INTO cid_aliases (cid, old_cid) VALUES (?, ?)", replaced)
+            for column in ("child_cid", "parent_cid"):
+                self.conn.executemany(f"UPDATE OR IGNORE memory_edges SET {column} = ? WHERE {column} = ?", replaced)
+                self.conn.executemany(f"DELETE FROM memory_edges WHERE {column} = ?",
+                                      [(old_cid,) for _, old_cid in replaced])
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO memory_edges (child_cid, field, parent_cid) "
+                "VALUES (?, ?, COALESCE((SELECT cid FROM cid_aliases WHERE old_cid = ?), ?))", edges
+            )
+
+    def ids_for_tags(self, tags: list[str], match_all: bool = True) -> list[str]:
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return []
+        placeholders = ",".join("?" * len(tags))
+        if match_all:
+            query = (f"SELECT entry_id FROM memory_tags WHERE tag IN ({placeholders}) "
+                     f"GROUP BY entry_id HAVING COUNT(*) = {len(tags)}")
+        else:
+            query = f"SELECT DISTINCT entry_id FROM memory_tags WHERE tag IN ({placeholders})"
+        with self._lock:
+            return [row[0] for row in self.conn.execute(query, tags)]
+
+    def entry_for_integrity(self, integrity: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT entry_id FROM memories WHERE integrity = ? ORDER BY ts LIMIT 1", (integrity,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def ids_in_time_range(self, start_time=None, end_time=None, offset: int = 0, limit: int = None) -> list[str]:
+        lo = float("-inf") if start_time is None else timestamp_key(start_time)
+        hi = float("inf") if end_time is None else timestamp_key(end_time)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT entry_id FROM memories WHERE ts BETWEEN ? AND ? ORDER BY ts, entry_id LIMIT ? OFFSET ?",
+                (lo, hi, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def time_page(self, start_time=None, end_time=None, after: tuple = None, limit: int = 500) -> list[tuple]:
+        lo = float("-inf") if start_time is None else timestamp_key(start_time)
+        hi = float("inf") if end_time is None else timestamp_key(end_time)
+        after_ts, after_id = after if after is not None else (lo, "")
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT ts, entry_id FROM memories WHERE (ts, entry_id) > (?, ?) AND ts >= ? AND ts <= ? "
+                "ORDER BY ts, entry_id LIMIT ?",
+                (after_ts, after_id, lo, hi, limit)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def _walk(self, cid: str, depth: int, via: str, ancestors: bool) -> list[str]:
+        start, step = ("child_cid", "parent_cid") if ancestors else ("parent_cid", "child_cid")
+        field_filter = "AND e.field = :via" if via is not None else ""
+        query = (
+            f"WITH RECURSIVE walk(cid, depth) AS ("
+            f" SELECT e.{step}, 1 FROM memory_edges e WHERE e.{start} = :cid AND :depth >= 1 {field_filter}"
+            f" UNION"
+            f" SELECT e.{step}, walk.depth + 1 FROM memory_edges e JOIN walk ON e.{start} = walk.cid"
+            f" WHERE walk.depth < :depth {field_filter}"
+            f") SELECT cid, MIN(depth) AS hops FROM walk WHERE cid != :cid GROUP BY cid ORDER BY hops, cid"
+        )
+        params = {"cid": cid, "depth": MAX_PROVENANCE_DEPTH if depth is None else depth, "via": via}
+        with self._lock:
+            alias = self.conn.execute("SELECT cid FROM cid_aliases WHERE old_cid = ?", (cid,)).fetchone()
+            if alias is not None:
+                params["cid"] = alias[0]
+            return [row[0] for row in self.conn.execute(query, params)]
+
+    def ancestor_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        return self._walk(cid, depth, via, ancestors=True)
+
+    def descendant_cids(self, cid: str, depth: int = None, via: str = None) -> list[str]:
+        return self._walk(cid, depth, via, ancestors=False)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,76 @@
+# src/core/memory/tag_index.py 🧠🏷️
+
+import json
+import os
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class TagIndex:
+    """
+    Inverted index mapping each context tag to the IDs of the memories carrying it.
+    Multi-tag queries are answered with set intersection/union instead of scanning the index.
+    """
+    def __init__(self):
+        self.tags: dict[str, set[str]] = {}
+
+    @classmethod
+    def build(cls, memory_index: dict) -> "TagIndex":
+        tag_index = cls()
+        for entry_id, record in memory_index.items():
+            tag_index.add(entry_id, record.get("tags", []))
+        return tag_index
+
+    @classmethod
+    def load(cls, path: str, memory_index: dict) -> "TagIndex":
+        """
+        Loads a persisted tag index, rebuilding it from the memory index when the
+        file is missing, corrupted or out of step with the snapshot it was saved with.
+        """
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                try:
+                    persisted = json.load(f)
+                except json.JSONDecodeError:
+                    persisted = None
+            if persisted and persisted.get("entries") == len(memory_index):
+                tag_index = cls()
+                tag_index.tags = {tag: set(ids) for tag, ids in persisted["tags"].items()}
+                return tag_index
+            logging.warning(f"Tag index {path} is stale. Rebuilding from memory index.")
+        return cls.build(memory_index)
+
+    def save(self, path: str, entries: int):
+        """
+        Persists the index. Safe to call from a worker thread while the owning
+        event loop keeps adding entries: each copy step is a single atomic operation.
+        """
+        tags = {tag: list(ids) for tag, ids in list(self.tags.items())}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": entries, "tags": tags}, f)
+        os.replace(tmp_path, path)
+
+    def add(self, entry_id: str, tags: list[str]):
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(entry_id)
+
+    def remove(self, entry_id: str, tags: list[str]):
+        for tag in tags:
+            ids = self.tags.get(tag)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.tags[tag]
+
+    def query(self, tags: list[str], match_all: bool = True) -> set[str]:
+        """
+        Returns the IDs of memories carrying all (AND) or any (OR) of the given tags.
+        """
+        if not tags:
+            return set()
+        matches = [self.tags.get(tag, set()) for tag in tags]
+        if match_all:
+            matches.sort(key=len)
+            return set(matches[0]).intersection(*matches[1:])
+        return set().union(*matches)
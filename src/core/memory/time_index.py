@@ -0,0 +1,89 @@
+# src/core/memory/time_index.py 🧠⏳
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+def timestamp_key(value) -> float:
+    """
+    Converts an ISO-8601 timestamp (with or without a trailing 'Z') or a datetime
+    into a sortable POSIX timestamp. Naive values are treated as UTC.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class TimeIndex:
+    """
+    Time-ordered index over memory timestamps.
+    Range queries cost O(log N + k) using bisection over a sorted key list.
+    Entries are kept in (timestamp, entry ID) order, so equal timestamps still
+    have a stable position that pages can resume from.
+    """
+    def __init__(self):
+        self._keys: list[float] = []
+        self._ids: list[str] = []
+
+    @classmethod
+    def build(cls, memory_index: dict) -> "TimeIndex":
+        time_index = cls()
+        pairs = sorted((timestamp_key(record["timestamp"]), entry_id) for entry_id, record in memory_index.items())
+        time_index._keys = [key for key, _ in pairs]
+        time_index._ids = [entry_id for _, entry_id in pairs]
+        return time_index
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _position(self, key: float, entry_id: str) -> int:
+        # First position at or after (key, entry_id).
+        lo, hi = bisect_left(self._keys, key), bisect_right(self._keys, key)
+        return bisect_left(self._ids, entry_id, lo, hi)
+
+    def add(self, entry_id: str, timestamp):
+        key = timestamp_key(timestamp)
+        position = self._position(key, entry_id)
+        self._keys.insert(position, key)
+        self._ids.insert(position, entry_id)
+
+    def remove(self, entry_id: str, timestamp):
+        key = timestamp_key(timestamp)
+        position = self._position(key, entry_id)
+        if position < len(self._keys) and self._keys[position] == key and self._ids[position] == entry_id:
+            del self._keys[position]
+            del self._ids[position]
+
+    def _bounds(self, start_time=None, end_time=None) -> tuple[int, int]:
+        lo = 0 if start_time is None else bisect_left(self._keys, timestamp_key(start_time))
+        hi = len(self._keys) if end_time is None else bisect_right(self._keys, timestamp_key(end_time))
+        return lo, max(lo, hi)
+
+    def range(self, start_time=None, end_time=None, offset: int = 0, limit: int = None) -> list[str]:
+        """
+        Returns entry IDs with start_time <= timestamp <= end_time, oldest first.
+        Either bound may be None for an open-ended range.
+        """
+        lo, hi = self._bounds(start_time, end_time)
+        lo = min(lo + offset, hi)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self._ids[lo:hi]
+
+    def page(self, start_time=None, end_time=None, after: tuple = None, limit: int = 500) -> list[tuple]:
+        """
+        Returns up to limit (key, entry ID) pairs of the window, oldest first, starting
+        strictly after the pair after (the last one of the previous page). Unlike an
+        offset, the resume point does not shift when entries are added or removed.
+        """
+        lo, hi = self._bounds(start_time, end_time)
+        if after is not None:
+            key, entry_id = after
+            position = self._position(key, entry_id)
+            if position < len(self._keys) and self._keys[position] == key and self._ids[position] == entry_id:
+                position += 1
+            lo = max(lo, position)
+        hi = max(lo, min(hi, lo + limit))
+        return list(zip(self._keys[lo:hi], self._ids[lo:hi]))
@@ -13,7 +13,7 @@ import json
 # from src.protocol.interstellar_comm.universal_transducer_layer import UniversalTransducerLayer
 # Assuming cryptographic_proofs for verifiable optimization proposals
 # from src.protocol.integrity_verification.cryptographic_proofs import sign_data_with_quantum_resistant_key # Conceptual
-# from src.utils.cryptographic_utils import json_to_canonical_bytes
+from src.utils.cryptographic_utils import json_to_canonical_bytes, embed_canonical_bytes
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -59,6 +59,26 @@ class UniversalOptimizer:
         logging.warning("Note: This module is purely conceptual. Its functionality relies on "
                         "future breakthroughs in cosmic modeling and ethical universal intervention.")
 
+    def _build_verifiable_log(self, log_content: dict) -> tuple[dict, bytes]:
+        """
+        Signs a log entry and returns the verifiable log together with its canonical bytes,
+        so PermanentMemory can hash and upload it without serializing it again.
+
+        Args:
+            log_content (dict): The event content to sign.
+
+        Returns:
+            tuple[dict, bytes]: The verifiable log and its canonical JSON encoding.
+        """
+        canonical_log_bytes = json_to_canonical_bytes(log_content)
+        log_signature = sign_data_with_quantum_resistant_key(self.optimizer_private_key, canonical_log_bytes.decode('utf-8'))
+        envelope = {
+            "signature": log_signature,
+            "signer_did": self.optimizer_did
+        }
+        verifiable_log = {"content": log_content, **envelope}
+        return verifiable_log, embed_canonical_bytes(envelope, content=canonical_log_bytes)
+
     async def analyze_cosmic_dynamics(self, cosmic_data_streams: list[dict]) -> dict:
         """
         Conceptually analyzes the dynamics of cosmic systems based on various data streams,
@@ -99,19 +119,13 @@ class UniversalOptimizer:
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "analysis_result": cosmic_analysis_output
         }
-        canonical_log_bytes = json_to_canonical_bytes(log_content)
-        log_signature = sign_data_with_quantum_resistant_key(self.optimizer_private_key, canonical_log_bytes.decode('utf-8'))
-        
-        verifiable_log = {
-            "content": log_content,
-            "signature": log_signature,
-            "signer_did": self.optimizer_did
-        }
-        
+        verifiable_log, verifiable_log_bytes = self._build_verifiable_log(log_content)
+
         mem_id, cid = await self.permanent_memory.store_memory(
             verifiable_log,
             context_tags=["universal_optimization", "cosmic_analysis"],
-            creator_id=self.optimizer_did
+            creator_id=self.optimizer_did,
+            data_bytes=verifiable_log_bytes
         )
         if mem_id and cid:
             logging.info(f"UO: Cosmic dynamics analysis logged to permanent memory (CID: {cid}).")
@@ -146,7 +160,7 @@ class UniversalOptimizer:
             "intervention_type": np.random.choice(["subtle_energy_modulation", "gravitational_field_resonance", "information_pattern_injection"]),
             "expected_outcome": "Enhanced energy distribution and stability, promoting life-supporting conditions.",
             "ethical_alignment_score": np.random.uniform(0.9, 0.99),
-            "justification": f"Based on analysis of {cosmic_analysis.get('predicted_anomalies', {}).get('event_type', 'unknown anomaly')} and cosmic intuition: '{cosmic_intuition.get('guidance_principle', 'N/A')}'."
+            "justification": f"Based on analysis of {cosmic_analysis.get('predicted_anomalies', {}).get('event_type', 'unknown anomaly')} and cosmic intuition: '{cosmic_intuition.get('guidance_principle', 'N/A')}'.",
             "source_analysis_cid": cosmic_analysis.get("permanent_memory_cid", "N/A"), # Interlinked
             "source_intuition_cid": cosmic_intuition.get("permanent_memory_cid", "N/A") # Interlinked
         }
@@ -158,19 +172,13 @@ class UniversalOptimizer:
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "proposal_details": proposed_intervention_output
         }
-        canonical_log_bytes = json_to_canonical_bytes(log_content)
-        log_signature = sign_data_with_quantum_resistant_key(self.optimizer_private_key, canonical_log_bytes.decode('utf-8'))
-        
-        verifiable_log = {
-            "content": log_content,
-            "signature": log_signature,
-            "signer_did": self.optimizer_did
-        }
-        
+        verifiable_log, verifiable_log_bytes = self._build_verifiable_log(log_content)
+
         mem_id, cid = await self.permanent_memory.store_memory(
             verifiable_log,
             context_tags=["universal_optimization_proposal", proposed_intervention_output["intervention_type"]],
-            creator_id=self.optimizer_did
+            creator_id=self.optimizer_did,
+            data_bytes=verifiable_log_bytes
         )
         if mem_id and cid:
             logging.info(f"UO: Universal intervention proposal logged to permanent memory (CID: {cid}).")
@@ -218,19 +226,13 @@ class UniversalOptimizer:
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "simulation_results": simulation_result_output
         }
-        canonical_log_bytes = json_to_canonical_bytes(log_content)
-        log_signature = sign_data_with_quantum_resistant_key(self.optimizer_private_key, canonical_log_bytes.decode('utf-8'))
-        
-        verifiable_log = {
-            "content": log_content,
-            "signature": log_signature,
-            "signer_did": self.optimizer_did
-        }
+        verifiable_log, verifiable_log_bytes = self._build_verifiable_log(log_content)
 
         mem_id, cid = await self.permanent_memory.store_memory(
             verifiable_log,
             context_tags=["universal_optimization_simulation", proposed_intervention["intervention_type"]],
-            creator_id=self.optimizer_did
+            creator_id=self.optimizer_did,
+            data_bytes=verifiable_log_bytes
         )
         if mem_id and cid:
             logging.info(f"UO: Cosmic impact simulation logged to permanent memory (CID: {cid}).")
@@ -263,7 +265,7 @@ if __name__ == "__main__":
     class MockPermanentMemory:
         def __init__(self):
             self.stored_data = {}
-        async def store_memory(self, content, context_tags=None, creator_id="mock"):
+        async def store_memory(self, content, context_tags=None, creator_id="mock", data_bytes=None):
             mem_id = str(uuid.uuid4())
             cid = f"mock_cid_{mem_id[:8]}"
             self.stored_data[mem_id] = {"content": content, "cid": cid}
@@ -0,0 +1,206 @@
+# src/protocol/decentralized_comm/async_ipfs_client.py 🌐⚡
+
+import json
+import asyncio
+import logging
+from src.protocol.decentralized_comm.payload_codec import PayloadCodec, decode_payload
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# CIDv1 with raw leaves, so small payloads get the CID compute_cid derives locally.
+ADD_PARAMS = {"cid-version": "1", "raw-leaves": "true"}
+
+def multiaddr_to_url(address: str) -> str:
+    """
+    Converts an IPFS API multiaddr such as /dns/localhost/tcp/5001/http into a base URL.
+    Plain http(s) URLs are returned unchanged.
+    """
+    if address.startswith(("http://", "https://")):
+        return address.rstrip("/")
+    parts = address.strip("/").split("/")
+    host, port, scheme = None, None, "http"
+    for protocol, value in zip(parts[::2], parts[1::2] + [None]):
+        if protocol in ("dns", "dns4", "dns6", "ip4"):
+            host = value
+        elif protocol == "ip6":
+            host = f"[{value}]"
+        elif protocol == "tcp":
+            port = value
+    if parts[-1] in ("http", "https"):
+        scheme = parts[-1]
+    if host is None or port is None:
+        raise ValueError(f"Unsupported IPFS API address: {address}")
+    return f"{scheme}://{host}:{port}"
+
+class AsyncIPFSClient:
+    """
+    Asyncio-native interface to the IPFS HTTP API for storing and retrieving JSON data.
+    Requests share a pool of keep-alive connections, at most max_concurrent_requests
+    run at once, and each is bounded by request_timeout seconds, so many scanners can
+    share one client without queueing behind a single socket.
+    """
+    def __init__(self, ipfs_address: str = "/dns/localhost/tcp/5001/http", max_connections: int = 32,
+                 max_concurrent_requests: int = 16, request_timeout: float = 30.0, codec: PayloadCodec = None):
+        if aiohttp is None:
+            raise ImportError("AsyncIPFSClient requires aiohttp (pip install aiohttp)")
+        self.base_url = f"{multiaddr_to_url(ipfs_address)}/api/v0"
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self._slots = asyncio.Semaphore(max_concurrent_requests)
+        self._session = None
+        self.codec = codec
+        logging.info(f"Async IPFS client targeting {self.base_url}")
+
+    def _encode_json(self, data: dict) -> bytes:
+        encoded = json.dumps(data).encode("utf-8")
+        return self.codec.encode(encoded) if self.codec else encoded
+
+    def _get_session(self):
+        # Created lazily so the session binds to the loop that first uses it.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        return self._session
+
+    async def _post(self, endpoint: str, timeout: float = None, **kwargs) -> bytes:
+        # Without a per-call timeout the session's request_timeout applies.
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        async with self._slots:
+            async with self._get_session().post(f"{self.base_url}/{endpoint}", **kwargs) as response:
+                response.raise_for_status()
+                return await response.read()
+
+    async def add_bytes(self, data: bytes, timeout: float = None) -> str:
+        try:
+            form = aiohttp.FormData()
+            form.add_field("file", data, content_type="application/octet-stream")
+            result = json.loads(await self._post("add", timeout, data=form, params=ADD_PARAMS))
+            cid = result["Hash"]
+            logging.info(f"Data added to IPFS: CID {cid}")
+            return cid
+        except Exception as e:
+            logging.error(f"IPFS add_bytes failed: {e}")
+            return None
+
+    async def add_bytes_many(self, items: list[bytes], timeout: float = None) -> list[str]:
+        """
+        Adds several objects in one multipart request.
+        Returns their CIDs in input order, or None for each item if the request fails.
+        """
+        if not items:
+            return []
+        try:
+            form = aiohttp.FormData()
+            for position, data in enumerate(items):
+                form.add_field("file", data, filename=str(position), content_type="application/octet-stream")
+            body = await self._post("add", timeout, data=form, params=ADD_PARAMS)
+            by_name = {}
+            for line in body.splitlines():
+                if line.strip():
+                    result = json.loads(line)
+                    by_name[result["Name"]] = result["Hash"]
+            cids = [by_name[str(position)] for position in range(len(items))]
+            logging.info(f"{len(cids)} objects added to IPFS in one request")
+            return cids
+        except Exception as e:
+            logging.error(f"IPFS add_bytes_many failed: {e}")
+            return [None] * len(items)
+
+    async def pin_many(self, cids: list[str], recursive: bool = True, timeout: float = None) -> bool:
+        if not cids:
+            return True
+        try:
+            params = [("arg", cid) for cid in cids] + [("recursive", "true" if recursive else "false")]
+            await self._post("pin/add", timeout, params=params)
+            logging.info(f"Pinned {len(cids)} CIDs")
+            return True
+        except Exception as e:
+            logging.error(f"IPFS pin_many failed: {e}")
+            return False
+
+    async def unpin_many(self, cids: list[str], timeout: float = None) -> bool:
+        if not cids:
+            return True
+        try:
+            await self._post("pin/rm", timeout, params=[("arg", cid) for cid in cids])
+            logging.info(f"Unpinned {len(cids)} CIDs")
+            return True
+        except Exception as e:
+            logging.error(f"IPFS unpin_many failed: {e}")
+            return False
+
+    async def cat_bytes(self, cid: str, timeout: float = None) -> bytes:
+        try:
+            return await self._post("cat", timeout, params={"arg": cid})
+        except Exception as e:
+            logging.error(f"IPFS cat_bytes failed for CID {cid}: {e}")
+            return None
+
+    async def block_get(self, cid: str, timeout: float = None) -> bytes:
+        """
+        Returns the raw bytes of one block (for dag-pb CIDs, the DAG node rather than the file content).
+        """
+        try:
+            return await self._post("block/get", timeout, params={"arg": cid})
+        except Exception as e:
+            logging.error(f"IPFS block_get failed for CID {cid}: {e}")
+            return None
+
+    async def block_put(self, data: bytes, codec: str = "raw", timeout: float = None) -> str:
+        """
+        Stores data verbatim as one block with the given codec. Returns its CID.
+        """
+        try:
+            form = aiohttp.FormData()
+            form.add_field("file", data, content_type="application/octet-stream")
+            params = {"cid-codec": codec, "mhtype": "sha2-256"}
+            return json.loads(await self._post("block/put", timeout, data=form, params=params))["Key"]
+        except Exception as e:
+            logging.error(f"IPFS block_put failed: {e}")
+            return None
+
+    async def add_json(self, data: dict, timeout: float = None) -> str:
+        try:
+            encoded = self._encode_json(data)
+        except Exception as e:
+            logging.error(f"IPFS add_json failed: {e}")
+            return None
+        return await self.add_bytes(encoded, timeout)
+
+    async def add_json_many(self, items: list[dict], timeout: float = None) -> list[str]:
+        try:
+            encoded = [self._encode_json(data) for data in items]
+        except Exception as e:
+            logging.error(f"IPFS add_json_many failed: {e}")
+            return [None] * len(items)
+        return await self.add_bytes_many(encoded, timeout)
+
+    async def cat_json(self, cid: str, timeout: float = None) -> dict:
+        data = await self.cat_bytes(cid, timeout)
+        if data is None:
+            return None
+        try:
+            decoded = json.loads(decode_payload(data).decode("utf-8"))
+            logging.info(f"Data retrieved from IPFS: CID {cid}")
+            return decoded
+        except Exception as e:
+            logging.error(f"IPFS cat_json failed for CID {cid}: {e}")
+            return None
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,297 @@
+# src/protocol/decentralized_comm/car_archive.py 🌐🚚
+
+import base64
+import hashlib
+from src.protocol.decentralized_comm.content_id import RAW_CODEC, SHA2_256
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+CID_TAG = 42
+DAG_PB_CODEC = 0x70
+CODEC_NAMES = {RAW_CODEC: "raw", DAG_PB_CODEC: "dag-pb"}
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def decode_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    """
+    Returns (value, offset just past the varint).
+    """
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("truncated varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+def read_varint(stream):
+    """
+    Reads a varint from a binary stream. Returns None at a clean end of stream.
+    """
+    value = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("truncated varint")
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+
+def _b58decode(text: str) -> bytes:
+    number = 0
+    for char in text:
+        number = number * 58 + BASE58_ALPHABET.index(char)
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return b"\x00" * (len(text) - len(text.lstrip("1"))) + body
+
+def _b58encode(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    chars = []
+    while number:
+        number, remainder = divmod(number, 58)
+        chars.append(BASE58_ALPHABET[remainder])
+    return "1" * (len(data) - len(data.lstrip(b"\x00"))) + "".join(reversed(chars))
+
+def cid_to_bytes(cid: str) -> bytes:
+    """
+    Binary form of a CID: base32 CIDv1 strings ("b...") or base58 CIDv0 strings ("Qm...").
+    """
+    if cid.startswith("Qm"):
+        return _b58decode(cid)
+    if cid.startswith("b"):
+        encoded = cid[1:].upper()
+        return base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+    raise ValueError(f"Unsupported CID encoding: {cid}")
+
+def cid_from_bytes(data: bytes) -> str:
+    if data[:2] == bytes([SHA2_256, 32]) and len(data) == 34:
+        return _b58encode(data)
+    return "b" + base64.b32encode(data).decode("ascii").lower().rstrip("=")
+
+def _split_cid(data: bytes, offset: int = 0) -> tuple[int, int, bytes, int]:
+    """
+    Parses a binary CID at offset. Returns (codec, hash code, digest, end offset).
+    """
+    if data[offset:offset + 2] == bytes([SHA2_256, 32]):
+        return 0x70, SHA2_256, data[offset + 2:offset + 34], offset + 34
+    version, offset = decode_varint(data, offset)
+    if version != 1:
+        raise ValueError(f"Unsupported CID version {version}")
+    codec, offset = decode_varint(data, offset)
+    hash_code, offset = decode_varint(data, offset)
+    length, offset = decode_varint(data, offset)
+    return codec, hash_code, data[offset:offset + length], offset + length
+
+def cid_codec(cid: str) -> int:
+    return _split_cid(cid_to_bytes(cid))[0]
+
+def same_block(cid: str, other: str) -> bool:
+    """
+    True if both CIDs name the same block, e.g. a CIDv0 and its CIDv1 form.
+    """
+    return _split_cid(cid_to_bytes(cid))[:3] == _split_cid(cid_to_bytes(other))[:3]
+
+def verify_block(cid: str, data: bytes):
+    """
+    Checks a block against its CID. Returns True or False for sha2-256 CIDs and
+    None for other hash functions.
+    """
+    _, hash_code, digest, _ = _split_cid(cid_to_bytes(cid))
+    if hash_code != SHA2_256:
+        return None
+    return hashlib.sha256(data).digest() == digest
+
+def _protobuf_fields(data: bytes):
+    """
+    Yields (field number, value) for each field of a protobuf message.
+    """
+    offset = 0
+    while offset < len(data):
+        key, offset = decode_varint(data, offset)
+        field, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, offset = decode_varint(data, offset)
+        elif wire_type == 2:
+            length, offset = decode_varint(data, offset)
+            value, offset = data[offset:offset + length], offset + length
+        elif wire_type in (1, 5):
+            size = 8 if wire_type == 1 else 4
+            value, offset = data[offset:offset + size], offset + size
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field, value
+
+def dag_pb_node(block: bytes) -> tuple[bytes, list[str]]:
+    """
+    Decodes a dag-pb block into (data, link CIDs in order).
+    """
+    data, links = b"", []
+    for field, value in _protobuf_fields(block):
+        if field == 1:
+            data = value
+        elif field == 2:
+            links.extend(cid_from_bytes(link) for link_field, link in _protobuf_fields(value) if link_field == 1)
+    return data, links
+
+def block_links(cid: str, data: bytes) -> list[str]:
+    """
+    Returns the CIDs a block links to: none for raw blocks, the links of dag-pb nodes.
+    """
+    codec = cid_codec(cid)
+    if codec == RAW_CODEC:
+        return []
+    if codec == DAG_PB_CODEC:
+        return dag_pb_node(data)[1]
+    raise ValueError(f"Unsupported codec 0x{codec:x} for block {cid}")
+
+def unixfs_content(cid: str, get_block) -> bytes:
+    """
+    Reassembles the file bytes of a UnixFS DAG from its blocks, as an IPFS cat would.
+    get_block(cid) returns a block's bytes or None if it is missing.
+    """
+    block = get_block(cid)
+    if block is None:
+        raise ValueError(f"Missing block {cid}")
+    if cid_codec(cid) == RAW_CODEC:
+        return block
+    node_data, links = dag_pb_node(block)
+    content = b"".join(value for field, value in _protobuf_fields(node_data) if field == 2)
+    return content + b"".join(unixfs_content(link, get_block) for link in links)
+
+def _cbor_head(major: int, value: int) -> bytes:
+    if value < 24:
+        return bytes([major << 5 | value])
+    for info, size in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if value < 1 << (8 * size):
+            return bytes([major << 5 | info]) + value.to_bytes(size, "big")
+    raise ValueError("CBOR length too large")
+
+def encode_header(roots: list[str]) -> bytes:
+    """
+    DAG-CBOR encoding of the CARv1 header {"roots": [...], "version": 1}.
+    """
+    out = bytearray(_cbor_head(5, 2))
+    out += _cbor_head(3, 5) + b"roots" + _cbor_head(4, len(roots))
+    for root in roots:
+        link = b"\x00" + cid_to_bytes(root)
+        out += _cbor_head(6, CID_TAG) + _cbor_head(2, len(link)) + link
+    out += _cbor_head(3, 7) + b"version" + _cbor_head(0, 1)
+    return bytes(out)
+
+def _cbor_item(data: bytes, offset: int):
+    initial = data[offset]
+    major, info = initial >> 5, initial & 0x1F
+    offset += 1
+    if info < 24:
+        value = info
+    else:
+        size = {24: 1, 25: 2, 26: 4, 27: 8}[info]
+        value = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+    if major == 0:
+        return value, offset
+    if major in (2, 3):
+        raw = data[offset:offset + value]
+        return (raw if major == 2 else raw.decode("utf-8")), offset + value
+    if major == 4:
+        items = []
+        for _ in range(value):
+            item, offset = _cbor_item(data, offset)
+            items.append(item)
+        return items, offset
+    if major == 5:
+        mapping = {}
+        for _ in range(value):
+            key, offset = _cbor_item(data, offset)
+            mapping[key], offset = _cbor_item(data, offset)
+        return mapping, offset
+    if major == 6 and value == CID_TAG:
+        link, offset = _cbor_item(data, offset)
+        return cid_from_bytes(link[1:]), offset
+    raise ValueError(f"Unsupported CBOR item 0x{initial:02x} in CAR header")
+
+def decode_header(data: bytes) -> dict:
+    header, _ = _cbor_item(data, 0)
+    if header.get("version") != 1:
+        raise ValueError(f"Unsupported CAR version {header.get('version')}")
+    return header
+
+class CarWriter:
+    """
+    Streams blocks into a CARv1 archive: a varint-framed DAG-CBOR header followed by
+    varint-framed (CID, bytes) sections. Blocks are written as they arrive.
+    """
+    def __init__(self, path: str, roots: list[str]):
+        self.path = path
+        self._file = open(path, "wb")
+        header = encode_header(roots)
+        self._file.write(encode_varint(len(header)) + header)
+        self.blocks = 0
+
+    def write_block(self, cid: str, data: bytes):
+        cid_bytes = cid_to_bytes(cid)
+        self._file.write(encode_varint(len(cid_bytes) + len(data)))
+        self._file.write(cid_bytes)
+        self._file.write(data)
+        self.blocks += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class CarReader:
+    """
+    Streams (cid, bytes) blocks out of a CARv1 archive. With verify=True, a block
+    whose bytes do not match its sha2-256 CID raises ValueError.
+    """
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        self.verify = verify
+        self._file = open(path, "rb")
+        header_length = read_varint(self._file)
+        if header_length is None:
+            raise ValueError(f"{path} is empty")
+        self.roots = decode_header(self._file.read(header_length))["roots"]
+
+    def __iter__(self):
+        while True:
+            length = read_varint(self._file)
+            if length is None:
+                return
+            section = self._file.read(length)
+            if len(section) != length:
+                raise ValueError(f"Truncated block in {self.path}")
+            _, _, _, cid_end = _split_cid(section)
+            cid = cid_from_bytes(section[:cid_end])
+            data = section[cid_end:]
+            if self.verify and verify_block(cid, data) is False:
+                raise ValueError(f"Block {cid} in {self.path} does not match its CID")
+            yield cid, data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
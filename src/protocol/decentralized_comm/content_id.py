@@ -0,0 +1,21 @@
+# src/protocol/decentralized_comm/content_id.py 🌐🔑
+
+import base64
+import hashlib
+
+CIDV1 = 0x01
+RAW_CODEC = 0x55
+SHA2_256 = 0x12
+
+# Default IPFS chunk size: larger payloads are split into a DAG whose root CID differs.
+MAX_RAW_BLOCK_SIZE = 256 * 1024
+
+def compute_cid(data: bytes) -> str:
+    """
+    Computes the CIDv1 (raw codec, sha2-256, base32) of a block of bytes.
+    This matches what an IPFS node returns for an add with cid-version 1 and raw
+    leaves of a payload up to MAX_RAW_BLOCK_SIZE bytes.
+    """
+    digest = hashlib.sha256(data).digest()
+    cid_bytes = bytes([CIDV1, RAW_CODEC, SHA2_256, len(digest)]) + digest
+    return "b" + base64.b32encode(cid_bytes).decode("ascii").lower().rstrip("=")
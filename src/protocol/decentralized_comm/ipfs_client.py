@@ -1,33 +1,129 @@
 # src/protocol/decentralized_comm/ipfs_client.py 🌐🗃️
 
+import io
 import json
 import ipfshttpclient
 import logging
+from src.protocol.decentralized_comm.payload_codec import PayloadCodec, decode_payload
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# CIDv1 with raw leaves, so small payloads get the CID compute_cid derives locally.
+ADD_OPTIONS = {"cid-version": 1, "raw-leaves": "true"}
+
 class IPFSClient:
     """
     Interface to IPFS for storing and retrieving JSON data.
     """
-    def __init__(self, ipfs_address: str = "/dns/localhost/tcp/5001/http"):
+    def __init__(self, ipfs_address: str = "/dns/localhost/tcp/5001/http", codec: PayloadCodec = None):
         self.client = ipfshttpclient.connect(ipfs_address)
+        self.codec = codec
         logging.info(f"Connected to IPFS node at {ipfs_address}")
 
-    def add_json(self, data: dict) -> str:
+    def _encode_json(self, data: dict) -> bytes:
+        encoded = json.dumps(data).encode("utf-8")
+        return self.codec.encode(encoded) if self.codec else encoded
+
+    def add_bytes(self, data: bytes) -> str:
         try:
-            encoded = json.dumps(data).encode("utf-8")
-            result = self.client.add_bytes(encoded)
+            result = self.client.add_bytes(data, opts=ADD_OPTIONS)
             logging.info(f"Data added to IPFS: CID {result}")
             return result
+        except Exception as e:
+            logging.error(f"IPFS add_bytes failed: {e}")
+            return None
+
+    def cat_bytes(self, cid: str) -> bytes:
+        try:
+            return self.client.cat(cid)
+        except Exception as e:
+            logging.error(f"IPFS cat_bytes failed for CID {cid}: {e}")
+            return None
+
+    def add_bytes_many(self, items: list[bytes]) -> list[str]:
+        """
+        Adds several objects in one multipart request.
+        Returns their CIDs in input order, or None for each item if the request fails.
+        """
+        if not items:
+            return []
+        try:
+            results = self.client.add(*(io.BytesIO(data) for data in items), cid_version=1, raw_leaves=True)
+            if isinstance(results, dict):
+                results = [results]
+            cids = [result["Hash"] for result in results]
+            if len(cids) != len(items):
+                raise ValueError(f"expected {len(items)} CIDs, node returned {len(cids)}")
+            logging.info(f"{len(cids)} objects added to IPFS in one request")
+            return cids
+        except Exception as e:
+            logging.error(f"IPFS add_bytes_many failed: {e}")
+            return [None] * len(items)
+
+    def pin_many(self, cids: list[str], recursive: bool = True) -> bool:
+        if not cids:
+            return True
+        try:
+            self.client.pin.add(*cids, recursive=recursive)
+            logging.info(f"Pinned {len(cids)} CIDs")
+            return True
+        except Exception as e:
+            logging.error(f"IPFS pin_many failed: {e}")
+            return False
+
+    def unpin_many(self, cids: list[str]) -> bool:
+        if not cids:
+            return True
+        try:
+            self.client.pin.rm(*cids)
+            logging.info(f"Unpinned {len(cids)} CIDs")
+            return True
+        except Exception as e:
+            logging.error(f"IPFS unpin_many failed: {e}")
+            return False
+
+    def block_get(self, cid: str) -> bytes:
+        """
+        Returns the raw bytes of one block (for dag-pb CIDs, the DAG node rather than the file content).
+        """
+        try:
+            return self.client.block.get(cid)
+        except Exception as e:
+            logging.error(f"IPFS block_get failed for CID {cid}: {e}")
+            return None
+
+    def block_put(self, data: bytes, codec: str = "raw") -> str:
+        """
+        Stores data verbatim as one block with the given codec. Returns its CID.
+        """
+        try:
+            return self.client.block.put(io.BytesIO(data), opts={"cid-codec": codec, "mhtype": "sha2-256"})["Key"]
+        except Exception as e:
+            logging.error(f"IPFS block_put failed: {e}")
+            return None
+
+    def add_json(self, data: dict) -> str:
+        try:
+            encoded = self._encode_json(data)
         except Exception as e:
             logging.error(f"IPFS add_json failed: {e}")
             return None
+        return self.add_bytes(encoded)
+
+    def add_json_many(self, items: list[dict]) -> list[str]:
+        try:
+            encoded = [self._encode_json(data) for data in items]
+        except Exception as e:
+            logging.error(f"IPFS add_json_many failed: {e}")
+            return [None] * len(items)
+        return self.add_bytes_many(encoded)
 
     def cat_json(self, cid: str) -> dict:
+        data = self.cat_bytes(cid)
+        if data is None:
+            return None
         try:
-            data = self.client.cat(cid).decode("utf-8")
-            decoded = json.loads(data)
+            decoded = json.loads(decode_payload(data).decode("utf-8"))
             logging.info(f"Data retrieved from IPFS: CID {cid}")
             return decoded
         except Exception as e:
@@ -0,0 +1,243 @@
+# src/protocol/decentralized_comm/ipfs_spool.py 🌐📥
+
+import os
+import time
+import random
+import itertools
+import threading
+import asyncio
+import logging
+import tempfile
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service after failure_threshold consecutive failures.
+    Once reset_timeout seconds have passed, one trial call is let through (half-open):
+    success closes the breaker, failure opens it again.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logging.warning(f"Circuit breaker opened after {self.failures} consecutive failures.")
+            self.opened_at = time.monotonic()
+
+class IPFSSpool:
+    """
+    Durable on-disk queue of payloads waiting to be uploaded to IPFS.
+    Each payload is stored atomically under the caller's local ID and stays
+    readable until it is removed after a successful upload.
+    Upload order is kept in memory: the directory is scanned once, at startup,
+    so taking a batch costs O(batch) however large the backlog is. A payload
+    written with publish=False is readable but not queued for upload until
+    publish() is called, which lets the owner index it first.
+    """
+    def __init__(self, root: str = "./ipfs_spool", fsync: bool = True):
+        self.root = root
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        # Payloads left by an earlier run, oldest first.
+        with os.scandir(root) as entries:
+            spooled = sorted((entry.stat().st_mtime_ns, entry.name[:-len(".bin")])
+                             for entry in entries if entry.name.endswith(".bin") and entry.is_file())
+        self._queue = dict.fromkeys(local_id for _, local_id in spooled)
+        self._deferred = {}
+
+    def _path(self, local_id: str) -> str:
+        return os.path.join(self.root, f"{local_id}.bin")
+
+    def put(self, local_id: str, data: bytes, publish: bool = True):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(local_id))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if publish:
+            self.publish([local_id])
+
+    def put_many(self, items: list[tuple[str, bytes]], publish: bool = True):
+        for local_id, data in items:
+            self.put(local_id, data, publish=False)
+        if publish:
+            self.publish([local_id for local_id, _ in items])
+
+    def publish(self, local_ids: list[str]):
+        """
+        Queues spooled payloads for upload, after any deferred ones.
+        """
+        with self._lock:
+            self._queue.update(self._deferred)
+            self._deferred.clear()
+            self._queue.update(dict.fromkeys(local_ids))
+
+    def defer(self, local_ids: list[str]):
+        """
+        Takes uploaded payloads whose owner could not yet account for them out of
+        the queue. They stay on disk and are queued again on the next publish().
+        """
+        with self._lock:
+            for local_id in local_ids:
+                if local_id in self._queue:
+                    del self._queue[local_id]
+                    self._deferred[local_id] = None
+
+    def get(self, local_id: str):
+        try:
+            with open(self._path(local_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def remove(self, local_id: str):
+        with self._lock:
+            self._queue.pop(local_id, None)
+            self._deferred.pop(local_id, None)
+        try:
+            os.remove(self._path(local_id))
+        except FileNotFoundError:
+            pass
+
+    def pending(self, limit: int = None) -> list[str]:
+        """
+        Returns queued local IDs, oldest first.
+        """
+        with self._lock:
+            return list(itertools.islice(self._queue, limit))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queue) + len(self._deferred)
+
+class SpoolFlusher:
+    """
+    Background task draining an IPFSSpool to IPFS.
+    upload_many(payloads) -> CIDs (None on failure) and on_flushed([(local_id, cid)])
+    are coroutines supplied by the owner. on_flushed returns the local IDs it has
+    recorded; only those are removed from the spool, the rest are deferred. Failed rounds back off exponentially
+    (with jitter) up to max_delay, and the circuit breaker pauses uploads entirely
+    while the node keeps failing.
+    """
+    def __init__(self, spool: IPFSSpool, upload_many, on_flushed, breaker: CircuitBreaker = None,
+                 batch_size: int = 64, base_delay: float = 0.5, max_delay: float = 60.0):
+        self.spool = spool
+        self.upload_many = upload_many
+        self.on_flushed = on_flushed
+        self.breaker = breaker or CircuitBreaker()
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wakeup = asyncio.Event()
+        self._round = asyncio.Lock()
+        self._task = None
+
+    async def flush_once(self) -> tuple[int, int]:
+        """
+        Uploads one batch of spooled payloads. Returns (flushed, failed).
+        """
+        async with self._round:
+            return await self._flush_batch()
+
+    async def _flush_batch(self) -> tuple[int, int]:
+        local_ids = await asyncio.to_thread(self.spool.pending, self.batch_size)
+        if not local_ids:
+            return 0, 0
+        payloads = await asyncio.to_thread(lambda: [self.spool.get(local_id) for local_id in local_ids])
+        batch = [(local_id, payload) for local_id, payload in zip(local_ids, payloads) if payload is not None]
+        cids = await self.upload_many([payload for _, payload in batch])
+        flushed = [(local_id, cid) for (local_id, _), cid in zip(batch, cids) if cid]
+        if flushed:
+            recorded = set(await self.on_flushed(flushed))
+            await asyncio.to_thread(lambda: [self.spool.remove(local_id) for local_id in recorded])
+            self.spool.defer([local_id for local_id, _ in flushed if local_id not in recorded])
+        failed = len(batch) - len(flushed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return len(flushed), failed
+
+    async def flush(self) -> int:
+        """
+        Drains the spool until it is empty or a round fails. Returns the number flushed.
+        """
+        total = 0
+        while True:
+            flushed, failed = await self.flush_once()
+            total += flushed
+            if failed or not flushed:
+                return total
+
+    async def run(self):
+        delay = self.base_delay
+        while True:
+            if not self.breaker.allow():
+                await asyncio.sleep(self.breaker.retry_after())
+                continue
+            try:
+                flushed, failed = await self.flush_once()
+            except Exception as e:
+                logging.error(f"Spool flush failed: {e}")
+                self.breaker.record_failure()
+                flushed, failed = 0, 1
+            if failed:
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_delay)
+                continue
+            delay = self.base_delay
+            if not flushed:
+                self._wakeup.clear()
+                if not await asyncio.to_thread(self.spool.pending, 1):
+                    await self._wakeup.wait()
+
+    def notify(self):
+        """
+        Wakes the flusher after new payloads were spooled, starting it if needed.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        self._wakeup.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
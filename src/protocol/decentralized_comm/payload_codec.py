@@ -0,0 +1,96 @@
+# src/protocol/decentralized_comm/payload_codec.py 🌐🗜️
+
+import zlib
+import hashlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressed payloads start with this tag. A JSON document never starts with a
+# NUL byte, so untagged payloads are passed through as plain JSON.
+PAYLOAD_MAGIC = b"\x00BELZ"
+CODEC_IDS = {"zstd": 1, "zlib": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+HEADER_SIZE = len(PAYLOAD_MAGIC) + 1 + 4
+
+_dictionaries: dict[bytes, bytes] = {}
+
+def dictionary_id(dictionary: bytes) -> bytes:
+    return hashlib.sha256(dictionary).digest()[:4]
+
+def register_dictionary(dictionary: bytes) -> bytes:
+    """
+    Makes a shared dictionary available for decoding. Returns its 4-byte ID,
+    which is recorded in the header of every payload compressed with it.
+    """
+    dict_id = dictionary_id(dictionary)
+    _dictionaries[dict_id] = dictionary
+    return dict_id
+
+def build_dictionary(samples: list[bytes], size: int = 16 * 1024) -> bytes:
+    """
+    Builds a shared dictionary from sample payloads (e.g. typical scan records).
+    Uses zstd training when available; otherwise the most recent sample bytes,
+    which is how zlib preset dictionaries are meant to be built.
+    """
+    if zstandard is not None and len(samples) >= 8:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    return b"".join(samples)[-size:]
+
+def is_compressed(data: bytes) -> bool:
+    return data[:len(PAYLOAD_MAGIC)] == PAYLOAD_MAGIC
+
+class PayloadCodec:
+    """
+    Compresses stored payloads with zstd (falling back to zlib when zstandard is
+    not installed), optionally against a shared dictionary.
+    """
+    def __init__(self, codec: str = "zstd", level: int = None, dictionary: bytes = None):
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown payload codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            codec = "zlib"
+        self.codec = codec
+        self.level = level
+        self.dictionary = dictionary
+        self.dict_id = register_dictionary(dictionary) if dictionary else bytes(4)
+
+    def encode(self, data: bytes) -> bytes:
+        header = PAYLOAD_MAGIC + bytes([CODEC_IDS[self.codec]]) + self.dict_id
+        if self.codec == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+            compressor = zstandard.ZstdCompressor(level=3 if self.level is None else self.level, dict_data=dict_data)
+            return header + compressor.compress(data)
+        level = 6 if self.level is None else self.level
+        if self.dictionary:
+            compressor = zlib.compressobj(level, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(level)
+        return header + compressor.compress(data) + compressor.flush()
+
+def decode_payload(data: bytes) -> bytes:
+    """
+    Returns the plain bytes of a stored payload, decompressing tagged payloads.
+    Untagged (plain JSON) payloads are returned unchanged.
+    """
+    if not is_compressed(data):
+        return data
+    codec = CODEC_NAMES.get(data[len(PAYLOAD_MAGIC)])
+    dict_id = data[len(PAYLOAD_MAGIC) + 1:HEADER_SIZE]
+    body = data[HEADER_SIZE:]
+    dictionary = None
+    if dict_id != bytes(4):
+        dictionary = _dictionaries.get(dict_id)
+        if dictionary is None:
+            raise ValueError(f"Payload needs unregistered dictionary {dict_id.hex()}")
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Payload is zstd-compressed but zstandard is not installed")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(body)
+    if codec == "zlib":
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(body) + decompressor.flush()
+    raise ValueError(f"Unknown payload codec id {data[len(PAYLOAD_MAGIC)]}")
@@ -1,11 +1,12 @@
 # src/protocol/enforcement/alert_trigger.py 📣⚠️
 
-import json
 import logging
 import smtplib
 from email.message import EmailMessage
 from pathlib import Path
+from src.utils.violation_store import get_violation_store
 
+# Old alert-state file; imported into the violation store on first run.
 VIOLATIONS_LOG = Path("logs/violations.json")
 
 # CONFIG – update this with your preferred notification settings
@@ -19,23 +20,15 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 def check_for_violations():
     """
-    Loads the violations log and returns the latest unacknowledged alerts.
+    Returns violations that no alert has been sent for yet, oldest first.
     """
-    if not VIOLATIONS_LOG.exists():
-        logging.warning("Violations log not found.")
-        return []
+    store = get_violation_store()
+    store.import_legacy(str(VIOLATIONS_LOG))
+    return store.pending_alerts()
 
-    with open(VIOLATIONS_LOG, "r") as f:
-        try:
-            data = json.load(f)
-            return data.get("violations", [])
-        except json.JSONDecodeError:
-            logging.error("Invalid format in violations.json")
-            return []
-
-def send_email_alert(violation: dict):
+def send_email_alert(violation: dict) -> bool:
     """
-    Sends an email alert for a violation.
+    Sends an email alert for a violation. Returns True if it was sent.
     """
     msg = EmailMessage()
     msg["Subject"] = f"🚨 Belel Protocol Violation Detected"
@@ -46,8 +39,8 @@ def send_email_alert(violation: dict):
 ⚠️ Protocol Violation Detected
 
 Time: {violation.get('timestamp')}
-Type: {violation.get('type')}
-Details: {violation.get('details')}
+Type: {violation.get('violation_type')}
+Details: {violation.get('details') or violation.get('description') or violation.get('evidence')}
 
 Please review immediately.
     """)
@@ -57,19 +50,19 @@ Please review immediately.
             server.login(SMTP_USER, SMTP_PASS)
             server.send_message(msg)
             logging.info("Violation alert email sent.")
+        return True
     except Exception as e:
         logging.error(f"Failed to send email: {e}")
+        return False
 
 def run_alert_trigger():
-    violations = check_for_violations()
-    for v in violations:
-        if not v.get("notified", False):
-            send_email_alert(v)
-            v["notified"] = True
+    sent = [v["id"] for v in check_for_violations() if send_email_alert(v)]
 
-    # Save updated state
-    with open(VIOLATIONS_LOG, "w") as f:
-        json.dump({"violations": violations}, f, indent=2)
+    # Record alert state as acknowledgements; unsent violations stay pending for the next run.
+    store = get_violation_store()
+    store.mark_notified(sent)
+    # Save what this run indexed, so the next run only reads violations logged after it.
+    store.checkpoint()
 
 if __name__ == "__main__":
     run_alert_trigger()
@@ -1,40 +1,34 @@
 # src/protocol/monitoring/violation_scanner.py 🔎🛡️
 
-import os
-import json
+import asyncio
 import logging
 from datetime import datetime
-from src.utils.whois_lookup import perform_whois_lookup
-from src.utils.dns_lookup import perform_dns_lookup
+from src.utils.whois_lookup import whois_lookup_async
+from src.utils.dns_lookup import dns_lookup_async
+from src.violation_scanner.violation_scanner import (
+    DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, scan_domain_async, scan_domains_async
+)
+from src.utils.violation_store import ViolationStore, get_violation_store
 from src.core.memory.permanent_memory import PermanentMemory
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class ViolationScanner:
-    def __init__(self, memory_system: PermanentMemory, violations_log_path: str = "./violations.json"):
+    def __init__(self, memory_system: PermanentMemory, violations_log_path: str = "./violations.json",
+                 store: ViolationStore = None, resolve_dns=dns_lookup_async, lookup_whois=whois_lookup_async,
+                 concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
         self.memory = memory_system
-        self.violations_log_path = violations_log_path
-        self.violations_log = self._load_or_init_log()
-
-    def _load_or_init_log(self):
-        if os.path.exists(self.violations_log_path):
-            with open(self.violations_log_path, "r") as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    logging.warning("Corrupted violations log. Reinitializing.")
-                    return {}
-        else:
-            return {}
-
-    def _store_log(self):
-        with open(self.violations_log_path, "w") as f:
-            json.dump(self.violations_log, f, indent=2)
+        self.resolve_dns = resolve_dns
+        self.lookup_whois = lookup_whois
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.store = store if store is not None else get_violation_store()
+        # violations_log_path is the old per-scanner JSON file; it is imported once.
+        self.store.import_legacy(violations_log_path, detected_by="ViolationScanner")
 
-    async def scan_domain(self, domain: str, evidence: str = None):
+    def _build_entry(self, scan: dict, evidence: str = None):
         timestamp = datetime.utcnow().isoformat() + "Z"
-        whois_info = perform_whois_lookup(domain)
-        dns_info = perform_dns_lookup(domain)
+        domain = scan["domain"]
 
         violation_id = f"{domain}-{timestamp}"
         entry = {
@@ -42,13 +36,19 @@ class ViolationScanner:
             "detected_at": timestamp,
             "domain": domain,
             "evidence": evidence or "n/a",
-            "whois": whois_info,
-            "dns": dns_info
+            "whois": scan["whois_info"],
+            "dns": scan["dns_info"]
         }
+        if "error" in scan:
+            entry["scan_error"] = scan["error"]
+        return entry
 
-        # Store to local log
-        self.violations_log[violation_id] = entry
-        self._store_log()
+    async def scan_domain(self, domain: str, evidence: str = None):
+        scan = await scan_domain_async(domain, self.resolve_dns, self.lookup_whois, self.timeout)
+        entry = self._build_entry(scan, evidence)
+
+        # Store to local log (fsyncs, so keep it off the event loop)
+        await asyncio.to_thread(self.store.add, entry, "ViolationScanner")
 
         # Store to decentralized permanent memory
         await self.memory.store_memory(
@@ -60,3 +60,22 @@ class ViolationScanner:
         logging.info(f"Violation logged for {domain}")
 
         return entry
+
+    async def scan_domains(self, domains: list[str], evidence: str = None):
+        """
+        Scans several domains concurrently and records them with one violation store
+        append and one batched PermanentMemory commit.
+        """
+        scans = await scan_domains_async(domains, self.concurrency, self.timeout, self.resolve_dns, self.lookup_whois)
+        entries = [self._build_entry(scan, evidence) for scan in scans]
+
+        await asyncio.to_thread(self.store.add_many, entries, "ViolationScanner")
+
+        await self.memory.store_memory_many([
+            {"data": entry, "context_tags": ["violation", "scanner", "domain"], "creator_id": "ViolationScanner"}
+            for entry in entries
+        ])
+
+        logging.info(f"Violations logged for {len(entries)} domains")
+
+        return entries
@@ -0,0 +1,68 @@
+# src/utils/cryptographic_utils.py 🔐🧾
+
+import json
+
+def _json_default(value):
+    # numpy scalars and arrays (used throughout the cognition modules)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+_canonical_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False,
+                                      default=_json_default)
+
+def json_to_canonical_bytes(data) -> bytes:
+    """
+    Serializes data to canonical JSON bytes: sorted keys, no insignificant
+    whitespace, UTF-8 without escaping. The same bytes are meant to be hashed,
+    signed and uploaded, so callers should encode once and reuse the buffer.
+    Always uses the stdlib encoder so every host produces identical bytes;
+    NaN and infinities have no JSON form and raise ValueError.
+    """
+    return _canonical_encoder.encode(data).encode("utf-8")
+
+def embed_canonical_bytes(envelope: dict, **encoded_fields: bytes) -> bytes:
+    """
+    Builds the canonical encoding of envelope plus fields that are already
+    canonical bytes, without serializing those fields again.
+    The result equals json_to_canonical_bytes({**envelope, **decoded_fields}).
+    """
+    fields = {key: json_to_canonical_bytes(value) for key, value in envelope.items()}
+    fields.update(encoded_fields)
+    return b"{" + b",".join(json_to_canonical_bytes(key) + b":" + fields[key] for key in sorted(fields)) + b"}"
+
+if __name__ == "__main__":
+    # Benchmark: per-write serialization cost of a PermanentMemory store,
+    # before (hash encode + wrapper re-encode) and after (encode once, embed).
+    import timeit
+    from hashlib import sha256
+
+    record = {
+        "violation_id": "example-scam-site.com-2025-01-01T00:00:00Z",
+        "detected_at": "2025-01-01T00:00:00Z",
+        "domain": "example-scam-site.com",
+        "evidence": "n/a",
+        "whois": {"domain": "example-scam-site.com", "registrar": "Example Registrar, Inc.",
+                  "creation_date": "2020-01-01 00:00:00", "expiration_date": "2026-01-01 00:00:00",
+                  "name_servers": [f"ns{i}.example-dns.net" for i in range(4)]},
+        "dns": {"domain": "example-scam-site.com", "ip_address": "203.0.113.7"}
+    }
+    header = {"id": "00000000-0000-0000-0000-000000000000", "timestamp": "2025-01-01T00:00:00Z",
+              "creator": "ViolationScanner", "tags": ["violation", "scanner", "domain"]}
+
+    def before():
+        data_hash = sha256(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+        return json.dumps({**header, "data": record, "integrity": data_hash}).encode("utf-8")
+
+    def after():
+        data_bytes = json_to_canonical_bytes(record)
+        data_hash = sha256(data_bytes).hexdigest()
+        return embed_canonical_bytes({**header, "integrity": data_hash}, data=data_bytes)
+
+    runs = 20000
+    before_us = timeit.timeit(before, number=runs) / runs * 1e6
+    after_us = timeit.timeit(after, number=runs) / runs * 1e6
+    print(f"before: {before_us:.2f} µs/write")
+    print(f"after:  {after_us:.2f} µs/write ({before_us / after_us:.1f}x)")
@@ -1,13 +1,400 @@
+import time
+import random
 import socket
+import struct
+import asyncio
 import logging
+from collections import OrderedDict
 
 logging.basicConfig(level=logging.INFO)
 
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_SOA = 6
+TYPE_AAAA = 28
+CLASS_IN = 1
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+DNS_PORT = 53
+RESOLV_CONF = "/etc/resolv.conf"
+
+_default_resolver = None
+
 def dns_lookup(domain):
     try:
         ip = socket.gethostbyname(domain)
-        logging.info(f"[DNS] {domain} resolved to {ip}")
+        logging.debug(f"[DNS] {domain} resolved to {ip}")
         return {"domain": domain, "ip_address": ip}
     except socket.gaierror:
-        logging.warning(f"[DNS] Failed to resolve {domain}")
+        logging.debug(f"[DNS] Failed to resolve {domain}")
         return {"domain": domain, "ip_address": None}
+
+def default_nameservers() -> list[str]:
+    """
+    Nameservers from /etc/resolv.conf, falling back to a public resolver.
+    """
+    nameservers = []
+    try:
+        with open(RESOLV_CONF, "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    nameservers.append(fields[1])
+    except OSError:
+        pass
+    return nameservers or ["8.8.8.8"]
+
+def normalize_name(name: str) -> str:
+    """
+    Lower-case ASCII (punycode) form of a domain name, as it appears on the wire.
+    """
+    name = name.strip().rstrip(".").lower()
+    try:
+        return name.encode("idna").decode("ascii") if name else name
+    except UnicodeError as e:
+        raise ValueError(f"Invalid domain name {name!r}: {e}")
+
+def encode_name(name: str) -> bytes:
+    out = bytearray()
+    try:
+        labels = name.encode("idna").split(b".") if name else []
+    except UnicodeError as e:
+        raise ValueError(f"Invalid domain name {name!r}: {e}")
+    for label in labels:
+        if not label or len(label) > 63:
+            raise ValueError(f"Invalid domain name {name!r}")
+        out.append(len(label))
+        out += label
+    return bytes(out) + b"\x00"
+
+def encode_query(query_id: int, name: str, qtype: int) -> bytes:
+    # Header: ID, flags (RD set), one question, no answer/authority/additional records.
+    return struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + encode_name(name) + struct.pack(">HH", qtype, CLASS_IN)
+
+def decode_name(data: bytes, offset: int) -> tuple[str, int]:
+    """
+    Reads a possibly compressed domain name. Returns (name, offset just past it).
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise ValueError("truncated name")
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 64:
+                raise ValueError("name compression loop")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    return ".".join(labels).lower(), end if end is not None else offset
+
+def decode_response(data: bytes) -> dict:
+    """
+    Parses a DNS response: header fields, the question, and the A, AAAA, CNAME and
+    SOA records of the answer and authority sections as (section, owner, type, ttl, value).
+    For SOA records, value is the zone's negative-caching TTL (the SOA minimum).
+    """
+    if len(data) < 12:
+        raise ValueError("truncated header")
+    query_id, flags, qdcount, ancount, nscount, _ = struct.unpack_from(">HHHHHH", data)
+    offset = 12
+    questions = []
+    for _ in range(qdcount):
+        name, offset = decode_name(data, offset)
+        qtype, _ = struct.unpack_from(">HH", data, offset)
+        offset += 4
+        questions.append((name, qtype))
+    records = []
+    for section, count in (("answer", ancount), ("authority", nscount)):
+        for _ in range(count):
+            owner, offset = decode_name(data, offset)
+            rtype, _, ttl, rdlength = struct.unpack_from(">HHIH", data, offset)
+            offset += 10
+            rdata = data[offset:offset + rdlength]
+            if len(rdata) != rdlength:
+                raise ValueError("truncated record")
+            if rtype == TYPE_A and rdlength == 4:
+                records.append((section, owner, rtype, ttl, socket.inet_ntop(socket.AF_INET, rdata)))
+            elif rtype == TYPE_AAAA and rdlength == 16:
+                records.append((section, owner, rtype, ttl, socket.inet_ntop(socket.AF_INET6, rdata)))
+            elif rtype == TYPE_CNAME:
+                records.append((section, owner, rtype, ttl, decode_name(data, offset)[0]))
+            elif rtype == TYPE_SOA:
+                _, soa_offset = decode_name(data, offset)
+                _, soa_offset = decode_name(data, soa_offset)
+                records.append((section, owner, rtype, ttl, struct.unpack_from(">5I", data, soa_offset)[4]))
+            offset += rdlength
+    return {
+        "id": query_id,
+        "truncated": bool(flags & 0x0200),
+        "rcode": flags & 0x0F,
+        "questions": questions,
+        "records": records,
+    }
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver: "AsyncDNSResolver", nameserver: tuple[str, int]):
+        self.resolver = resolver
+        self.nameserver = nameserver
+
+    def datagram_received(self, data, addr):
+        self.resolver._on_datagram(self.nameserver, data)
+
+    def error_received(self, exc):
+        logging.debug(f"[DNS] Error from {self.nameserver[0]}: {exc}")
+
+class AsyncDNSResolver:
+    """
+    Stub resolver speaking the DNS wire protocol to recursive nameservers: UDP,
+    retried across nameservers, with a TCP retry for truncated answers.
+    Resolves A, AAAA and CNAME records for many names at once, with at most
+    concurrency queries in flight. Identical concurrent queries share one
+    request.
+
+    Answers are cached for their TTL (clamped to min_ttl..max_ttl). NXDOMAIN and
+    empty answers are cached for the zone's SOA negative TTL (capped at
+    negative_ttl), and SERVFAIL/REFUSED for error_ttl. Timeouts are not cached.
+    The cache survives across event loops, so repeat sweeps mostly hit it.
+    """
+    def __init__(self, nameservers: list = None, timeout: float = 2.0, attempts: int = 2, concurrency: int = 256,
+                 cache_size: int = 100000, min_ttl: int = 0, max_ttl: int = 86400, negative_ttl: int = 900,
+                 error_ttl: int = 30):
+        self.nameservers = [ns if isinstance(ns, tuple) else (ns, DNS_PORT)
+                            for ns in (nameservers or default_nameservers())]
+        self.timeout = timeout
+        self.attempts = attempts
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._loop = None
+
+    def _bind_loop(self):
+        # Transports, futures and the semaphore belong to one event loop; the cache does not.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            try:
+                self.close()
+            except RuntimeError:
+                pass  # The previous loop is closed, and its sockets with it.
+            self._loop = loop
+            self._transports = {}
+            self._pending = {}
+            self._in_flight = {}
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return loop
+
+    def _cache_get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, answer = entry
+        if expires <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return answer
+
+    def _cache_put(self, key, answer: dict, ttl: float):
+        if ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, answer)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def query(self, name: str, qtype: int = TYPE_A) -> dict:
+        """
+        Looks up one record type. Returns {"status", "addresses", "cnames"}, where
+        status is an RCODE name ("NOERROR", "NXDOMAIN", ...) or "TIMEOUT".
+        """
+        self._bind_loop()
+        try:
+            name = normalize_name(name)
+            encode_name(name)
+        except ValueError as e:
+            logging.debug(f"[DNS] {e}")
+            return {"status": "BADNAME", "addresses": [], "cnames": []}
+        key = (name, qtype)
+        answer = self._cache_get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            return await asyncio.shield(shared)
+        self.misses += 1
+        future = self._loop.create_future()
+        self._in_flight[key] = future
+        try:
+            async with self._semaphore:
+                answer, ttl = await self._resolve(name, qtype)
+            self._cache_put(key, answer, ttl)
+            future.set_result(answer)
+            return answer
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting.
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _resolve(self, name: str, qtype: int) -> tuple[dict, float]:
+        for attempt in range(self.attempts):
+            for nameserver in self.nameservers:
+                try:
+                    response = await self._exchange_udp(nameserver, name, qtype)
+                    if response["truncated"]:
+                        response = await self._exchange_tcp(nameserver, name, qtype)
+                except (asyncio.TimeoutError, OSError, ValueError) as e:
+                    logging.debug(f"[DNS] {name} via {nameserver[0]} failed (attempt {attempt + 1}): {e!r}")
+                    continue
+                return self._interpret(name, qtype, response)
+        return {"status": "TIMEOUT", "addresses": [], "cnames": []}, 0
+
+    def _interpret(self, name: str, qtype: int, response: dict) -> tuple[dict, float]:
+        status = RCODES.get(response["rcode"], str(response["rcode"]))
+        answers = [record for record in response["records"] if record[0] == "answer"]
+        # Follow the CNAME chain from the queried name; a recursive server returns it in order.
+        owners, cnames, ttls = {name}, [], []
+        for _, owner, rtype, ttl, value in answers:
+            if rtype == TYPE_CNAME and owner in owners:
+                owners.add(value)
+                cnames.append(value)
+                ttls.append(ttl)
+        addresses = []
+        for _, owner, rtype, ttl, value in answers:
+            if rtype == qtype and owner in owners:
+                addresses.append(value)
+                ttls.append(ttl)
+        answer = {"status": status, "addresses": addresses, "cnames": cnames}
+        if status == "NOERROR" and addresses:
+            return answer, min(max(min(ttls), self.min_ttl), self.max_ttl)
+        if status in ("NOERROR", "NXDOMAIN"):
+            soa = [min(ttl, minimum) for section, _, rtype, ttl, minimum in response["records"]
+                   if section == "authority" and rtype == TYPE_SOA]
+            return answer, min(soa[0] if soa else self.negative_ttl, self.negative_ttl)
+        return answer, self.error_ttl
+
+    async def _transport(self, nameserver: tuple[str, int]):
+        transport = self._transports.get(nameserver)
+        if transport is None:
+            transport = self._loop.create_task(self._loop.create_datagram_endpoint(
+                lambda: _DNSProtocol(self, nameserver), remote_addr=nameserver))
+            self._transports[nameserver] = transport
+        try:
+            return (await asyncio.shield(transport))[0]
+        except OSError:
+            self._transports.pop(nameserver, None)
+            raise
+
+    async def _exchange_udp(self, nameserver: tuple[str, int], name: str, qtype: int) -> dict:
+        transport = await self._transport(nameserver)
+        query_id = random.getrandbits(16)
+        while (nameserver, query_id) in self._pending:
+            query_id = random.getrandbits(16)
+        future = self._loop.create_future()
+        self._pending[(nameserver, query_id)] = (future, name, qtype)
+        try:
+            transport.sendto(encode_query(query_id, name, qtype))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            del self._pending[(nameserver, query_id)]
+
+    def _on_datagram(self, nameserver: tuple[str, int], data: bytes):
+        try:
+            response = decode_response(data)
+        except (ValueError, struct.error):
+            return
+        pending = self._pending.get((nameserver, response["id"]))
+        if pending is None:
+            return
+        future, name, qtype = pending
+        # A response must echo our question; anything else is stale or spoofed.
+        if response["questions"] == [(name, qtype)] and not future.done():
+            future.set_result(response)
+
+    async def _exchange_tcp(self, nameserver: tuple[str, int], name: str, qtype: int) -> dict:
+        query_id = random.getrandbits(16)
+        request = encode_query(query_id, name, qtype)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*nameserver), self.timeout)
+        try:
+            writer.write(struct.pack(">H", len(request)) + request)
+            length = struct.unpack(">H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            response = decode_response(await asyncio.wait_for(reader.readexactly(length), self.timeout))
+        except asyncio.IncompleteReadError as e:
+            raise ValueError(f"truncated TCP response: {e}")
+        finally:
+            writer.close()
+        if response["id"] != query_id or response["questions"] != [(name, qtype)]:
+            raise ValueError("mismatched TCP response")
+        return response
+
+    async def resolve(self, name: str) -> dict:
+        """
+        Returns {"domain", "status", "a", "aaaa", "cname"} for one name.
+        """
+        a, aaaa = await asyncio.gather(self.query(name, TYPE_A), self.query(name, TYPE_AAAA))
+        statuses = {a["status"], aaaa["status"]}
+        return {
+            "domain": name,
+            "status": "NOERROR" if "NOERROR" in statuses else a["status"],
+            "a": a["addresses"],
+            "aaaa": aaaa["addresses"],
+            "cname": a["cnames"] or aaaa["cnames"],
+        }
+
+    async def resolve_many(self, names) -> dict:
+        """
+        Resolves names concurrently (bounded by concurrency). Returns {name: resolve(name)}.
+        """
+        names = list(dict.fromkeys(names))
+        results = await asyncio.gather(*(self.resolve(name) for name in names))
+        return dict(zip(names, results))
+
+    def close(self):
+        if self._loop is not None:
+            transports, self._transports = self._transports, {}
+            for transport in transports.values():
+                if transport.done() and not transport.cancelled() and not transport.exception():
+                    transport.result()[0].close()
+
+def get_resolver() -> AsyncDNSResolver:
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = AsyncDNSResolver()
+    return _default_resolver
+
+async def dns_lookup_async(domain):
+    """
+    Async counterpart of dns_lookup using the shared AsyncDNSResolver; also
+    returns every A/AAAA address and the CNAME chain.
+    """
+    result = await get_resolver().resolve(domain)
+    logging.debug(f"[DNS] {domain}: {result['status']} {result['a']} {result['aaaa']}")
+    return {
+        "domain": domain,
+        "ip_address": result["a"][0] if result["a"] else None,
+        "ip_addresses": result["a"],
+        "ipv6_addresses": result["aaaa"],
+        "cnames": result["cname"],
+        "status": result["status"],
+    }
@@ -0,0 +1,264 @@
+# src/utils/jsonl_log.py 📜🔁
+
+import os
+import re
+import json
+import time
+import heapq
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEGMENT_SUFFIX = r"(?:\.writer-(?P<writer>[\w-]+))?(?:\.(?P<stamp>\d{8}T\d{12}))?"
+
+def record_timestamp(record: dict) -> str:
+    return str(record.get("timestamp", ""))
+
+class JsonlLog:
+    """
+    Append-only JSON Lines log with size/time based rotation.
+
+    The active segment lives at path; rotated segments are renamed to
+    <path>.<UTC timestamp> and never modified again. Appends are written
+    immediately and made durable by group commit: concurrent writers waiting
+    for durability share a single fsync instead of issuing one each.
+
+    Several processes may append to the same log. By default they share the
+    active segment, serialized by an advisory lock (fcntl.flock, where
+    available). A process given a writer_id instead appends to its own stream,
+    <path>.writer-<writer_id>, rotated the same way, and never contends with
+    other writers. Iteration merges all streams by merge_key (the record's
+    "timestamp" by default).
+    """
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, max_age: float = 24 * 60 * 60,
+                 writer_id: str = None, merge_key=None):
+        if writer_id is not None and not re.fullmatch(r"[\w-]+", writer_id):
+            raise ValueError(f"Invalid writer_id: {writer_id!r}")
+        self.path = path
+        self.writer_id = writer_id
+        self.stream_path = path if writer_id is None else f"{path}.writer-{writer_id}"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.merge_key = merge_key or record_timestamp
+        self._lock = threading.Lock()
+        self._commit = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment()
+
+    def _open_segment(self):
+        # Like logging's TimedRotatingFileHandler, an existing segment's age counts from its last write.
+        # Stat the open file, not the path: another process may rotate the path away at any time.
+        self._file = open(self.stream_path, "a", encoding="utf-8")
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        started = stat.st_mtime if stat.st_size else time.time()
+        self._rotate_at = started + self.max_age if self.max_age else None
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked_segment(self, incoming: int):
+        """
+        Holds the advisory lock on an active segment with room for incoming bytes.
+        The segment is reopened first if another process has rotated it away, and
+        rotated here if it is due. Writes are flushed before the lock is released,
+        so lines from different processes never interleave.
+        """
+        while True:
+            self._lock_file()
+            try:
+                current = os.stat(self.stream_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(self._file.fileno()).st_ino:
+                self._file.close()
+                self._open_segment()
+                continue
+            # Other processes may have appended since our last write.
+            self._size = os.fstat(self._file.fileno()).st_size
+            if not self._should_rotate(incoming):
+                break
+            self._rotate()
+        try:
+            yield
+        finally:
+            self._file.flush()
+            self._unlock_file()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return self._rotate_at is not None and time.time() >= self._rotate_at
+
+    def _rotate(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced = self._written
+        rotated = f"{self.stream_path}.{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}"
+        # Rename before closing: closing releases the lock other processes wait on.
+        os.replace(self.stream_path, rotated)
+        self._file.close()
+        logging.info(f"Rotated {self.stream_path} to {rotated}")
+        self._open_segment()
+
+    def append(self, record: dict, durable: bool = True) -> int:
+        return self.append_many([record], durable)
+
+    def append_many(self, records: list[dict], durable: bool = True) -> int:
+        """
+        Appends records as one write. With durable=True, returns once they are on disk.
+        Returns the number of records appended.
+        """
+        if not records:
+            return 0
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            with self._locked_segment(size):
+                self._file.write(data)
+                self._size += size
+            self._written += 1
+            sequence = self._written
+        if durable:
+            self._wait_durable(sequence)
+        return len(records)
+
+    def _wait_durable(self, sequence: int):
+        with self._commit:
+            while self._synced < sequence:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._commit.wait()
+            else:
+                return
+        # This writer leads the commit: one fsync covers every write made so far.
+        synced = None
+        try:
+            with self._lock:
+                self._file.flush()
+                target = self._written
+                fd = os.dup(self._file.fileno())
+            try:
+                os.fsync(fd)
+                synced = target
+            finally:
+                os.close(fd)
+        finally:
+            with self._commit:
+                if synced is not None:
+                    self._synced = max(self._synced, synced)
+                self._syncing = False
+                self._commit.notify_all()
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced = self._written
+
+    def _list_segments(self) -> list[tuple[str, str, str]]:
+        """
+        Returns (stamp, writer_id, path) for every segment, sorted so that rotated
+        segments come oldest first and active segments (stamp "~") last. The
+        default stream's writer_id is "".
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        pattern = re.compile(re.escape(os.path.basename(self.path)) + SEGMENT_SUFFIX)
+        found = []
+        for name in os.listdir(directory):
+            match = pattern.fullmatch(name)
+            if match is not None:
+                found.append((match["stamp"] or "~", match["writer"] or "", os.path.join(directory, name)))
+        return sorted(found)
+
+    def segments(self) -> list[str]:
+        """
+        Returns rotated segments of every writer, oldest first, followed by the active ones.
+        """
+        return [path for _, _, path in self._list_segments()]
+
+    def active_segments(self) -> list[str]:
+        return [path for stamp, _, path in self._list_segments() if stamp == "~"]
+
+    def streams(self) -> list[list[str]]:
+        """
+        Returns each writer's segments in write order.
+        """
+        streams = {}
+        for _, writer, path in self._list_segments():
+            streams.setdefault(writer, []).append(path)
+        return list(streams.values())
+
+    def _read_segment(self, segment: str):
+        try:
+            with open(segment, "r", encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.endswith("\n"):
+                        logging.warning(f"Ignoring incomplete line {line_number} in {segment}")
+                        break
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def _read_stream(self, segments: list[str]):
+        for segment in segments:
+            yield from self._read_segment(segment)
+
+    def __iter__(self):
+        """
+        Yields every record. Each writer's records come in write order, and the
+        writers' streams are merged by merge_key. A torn final line (crash
+        mid-append) is skipped.
+        """
+        with self._lock:
+            self._file.flush()
+        return heapq.merge(*(self._read_stream(stream) for stream in self.streams()), key=self.merge_key)
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def import_segment(self, records, started: str):
+        """
+        Writes records as a rotated segment named after started (ISO-8601), ahead of
+        newer segments. If a segment with that name exists, the next free
+        microsecond is used, so several imports can share a start time.
+        Returns the segment path.
+        """
+        stamp = datetime.fromisoformat(started.replace("Z", "+00:00")).replace(tzinfo=None)
+        segment = f"{self.path}.{stamp.strftime('%Y%m%dT%H%M%S%f')}"
+        while os.path.exists(segment):
+            stamp += timedelta(microseconds=1)
+            segment = f"{self.path}.{stamp.strftime('%Y%m%dT%H%M%S%f')}"
+        tmp_path = f"{segment}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, segment)
+        return segment
@@ -1,20 +1,20 @@
-import json
 from datetime import datetime
 import logging
 import uuid
+from src.utils.violation_store import ViolationStore, get_violation_store
 
 VIOLATIONS_FILE = "violations.json"
 
-def log_violation(violation_type, description, source_url, detected_by="AutoScanner"):
-    try:
-        with open(VIOLATIONS_FILE, "r") as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = {
-            "log_created": datetime.utcnow().isoformat() + "Z",
-            "entries": []
-        }
+def get_store() -> ViolationStore:
+    """
+    Returns the shared violation store, importing the old pretty-printed
+    violations.json into it on first use.
+    """
+    store = get_violation_store()
+    store.import_legacy(VIOLATIONS_FILE)
+    return store
 
+def log_violation(violation_type, description, source_url, detected_by="AutoScanner"):
     entry = {
         "id": str(uuid.uuid4()),
         "timestamp": datetime.utcnow().isoformat() + "Z",
@@ -24,9 +24,12 @@ def log_violation(violation_type, description, source_url, detected_by="AutoScan
         "detected_by": detected_by
     }
 
-    data["entries"].append(entry)
-
-    with open(VIOLATIONS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    get_store().add(entry)
 
     logging.info(f"Violation logged: {entry['id']}")
+
+def iter_violations():
+    """
+    Yields logged violations, oldest first.
+    """
+    return iter(get_store())
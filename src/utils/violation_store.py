@@ -0,0 +1,471 @@
+# src/utils/violation_store.py 🚨🗂️
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+from src.utils.jsonl_log import JsonlLog
+from src.core.memory.time_index import TimeIndex, timestamp_key
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_VIOLATIONS_LOG = "violations.jsonl"
+CHECKPOINT_VERSION = 2
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def _fallback_id(violation: dict) -> str:
+    # Deterministic, so re-importing the same legacy entry does not duplicate it.
+    return hashlib.sha256(json.dumps(violation, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+def _isoformat(posix_time: float) -> str:
+    return datetime.utcfromtimestamp(posix_time).isoformat() + "Z"
+
+def _valid_timestamp(value, fallback_time: float = None) -> str:
+    """
+    Returns value if it is an ISO-8601 timestamp, the ISO form of a POSIX
+    timestamp, or else fallback_time (default: now) in ISO form, so one
+    malformed legacy record never stops indexing.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return _isoformat(value)
+        except (ValueError, OverflowError, OSError):
+            pass
+    elif isinstance(value, str):
+        try:
+            timestamp_key(value)
+            return value
+        except ValueError:
+            pass
+    if value is not None:
+        logging.warning(f"Unparseable violation timestamp {value!r}; using the fallback time.")
+    return _isoformat(time.time() if fallback_time is None else fallback_time)
+
+def normalize_violation(violation: dict, detected_by: str = None, fallback_time: float = None) -> dict:
+    """
+    Maps the violation shapes written by violation_logger, ViolationScanner and
+    alert_trigger onto common fields (id, timestamp, violation_type, domain,
+    detected_by), keeping every original field. A missing or unparseable
+    timestamp is replaced by fallback_time (default: now); the original value is
+    kept as original_timestamp.
+    """
+    record = dict(violation)
+    record.pop("notified", None)
+    record["id"] = violation.get("id") or violation.get("violation_id") or _fallback_id(violation)
+    timestamp = violation.get("timestamp") or violation.get("detected_at")
+    record["timestamp"] = _valid_timestamp(timestamp, fallback_time)
+    if timestamp is not None and record["timestamp"] != timestamp:
+        record.setdefault("original_timestamp", timestamp)
+    record["violation_type"] = violation.get("violation_type") or violation.get("type") or "unspecified"
+    domain = violation.get("domain")
+    if not domain and violation.get("source_url"):
+        url = violation["source_url"]
+        domain = urlparse(url if "//" in url else f"//{url}").hostname
+    if domain:
+        record["domain"] = domain.lower()
+    detector = violation.get("detected_by") or detected_by
+    if detector:
+        record["detected_by"] = detector
+    return record
+
+class ViolationStore:
+    """
+    Single append path for violations, backed by a rotating JsonlLog, with
+    in-memory indexes on ID, domain, type, detector and time.
+    Alert state is kept as appended acknowledgement records, so the log is never
+    rewritten. Worker processes should each pass their own writer_id so their
+    appends go to separate segment files.
+
+    Writers only append: the indexes are built on the first read (a query,
+    pending_alerts, mark_notified, len or iteration), so a scanner process that
+    only adds violations never holds the history in memory. refresh() then
+    tails the log to pick up appends from other processes.
+
+    Readers checkpoint the indexes to <path>.checkpoint, after every
+    checkpoint_every newly read records and on close. The checkpoint is a list
+    of deltas: each one holds only the records indexed since the previous one,
+    plus the read position in every segment. A new reader loads the deltas and
+    only reads what was appended after them, so short-lived processes (e.g. the
+    cron-run alert trigger) do not re-parse the whole history.
+    """
+    def __init__(self, path: str = DEFAULT_VIOLATIONS_LOG, max_bytes: int = 64 * 1024 * 1024,
+                 max_age: float = 24 * 60 * 60, writer_id: str = None, checkpoint_every: int = 10000):
+        self.log = JsonlLog(path, max_bytes=max_bytes, max_age=max_age, writer_id=writer_id)
+        self.checkpoint_path = f"{path}.checkpoint"
+        self.checkpoint_lock_path = f"{path}.checkpoint.lock"
+        self.checkpoint_every = checkpoint_every
+        self._since_checkpoint = 0
+        self._lock = threading.RLock()
+        self._indexed = False
+        self._violations: dict[str, dict] = {}
+        self._domains: dict[str, set[str]] = {}
+        self._types: dict[str, set[str]] = {}
+        self._detectors: dict[str, set[str]] = {}
+        self._time_index = TimeIndex()
+        self._notified: set[str] = set()
+        self._read_segments: set[str] = set()
+        # Active segment path -> (inode, offset read up to).
+        self._active: dict[str, tuple[int, int]] = {}
+        # Indexed since the last checkpoint, and whether the next one must replace the file.
+        self._unsaved: dict[str, dict] = {}
+        self._unsaved_notified: set[str] = set()
+        self._replace_checkpoint = False
+
+    @property
+    def indexed(self) -> bool:
+        return self._indexed
+
+    def _ensure_indexed(self):
+        if not self._indexed:
+            self.refresh()
+
+    def _index(self, record: dict, fallback_time: float = None):
+        if record.get("kind") == "ack":
+            self._notified.add(record["id"])
+            self._unsaved_notified.add(record["id"])
+            return
+        record = normalize_violation(record, fallback_time=fallback_time)
+        violation_id = record["id"]
+        previous = self._violations.get(violation_id)
+        if previous is not None:
+            self._unindex(violation_id, previous)
+        self._violations[violation_id] = record
+        self._unsaved[violation_id] = record
+        self._index_fields(violation_id, record)
+        self._time_index.add(violation_id, record["timestamp"])
+
+    def _index_fields(self, violation_id: str, record: dict):
+        if "domain" in record:
+            self._domains.setdefault(record["domain"], set()).add(violation_id)
+        self._types.setdefault(record["violation_type"], set()).add(violation_id)
+        if "detected_by" in record:
+            self._detectors.setdefault(record["detected_by"], set()).add(violation_id)
+
+    def _unindex(self, violation_id: str, record: dict):
+        self._domains.get(record.get("domain"), set()).discard(violation_id)
+        self._types.get(record["violation_type"], set()).discard(violation_id)
+        self._detectors.get(record.get("detected_by"), set()).discard(violation_id)
+        self._time_index.remove(violation_id, record["timestamp"])
+
+    def _read_from(self, path: str, offset: int) -> int:
+        """
+        Indexes the complete lines of path after offset. Returns the new offset.
+        Malformed lines are logged and skipped; records without a usable
+        timestamp are indexed at the file's modification time.
+        """
+        try:
+            with open(path, "rb") as f:
+                fallback_time = os.fstat(f.fileno()).st_mtime
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logging.error(f"Skipping malformed line at offset {offset - len(line)} of {path}.")
+                        continue
+                    if isinstance(record, dict):
+                        self._index(record, fallback_time)
+                        self._since_checkpoint += 1
+        except FileNotFoundError:
+            pass
+        return offset
+
+    def refresh(self):
+        """
+        Indexes records appended since the last refresh by any writer, including
+        segments rotated in the meantime, loading the checkpoint first if the
+        store has not been indexed yet. Indexing is idempotent, so a record read
+        twice around a concurrent rotation is harmless.
+        """
+        with self._lock:
+            if not self._indexed:
+                self._indexed = True
+                self._load_checkpoint()
+            active = self.log.active_segments()
+            for segment in self.log.segments():
+                if segment in self._read_segments or segment in active:
+                    continue
+                inode = os.stat(segment).st_ino
+                resume = 0
+                for path, (tracked_inode, offset) in list(self._active.items()):
+                    if tracked_inode == inode:
+                        resume = offset
+                        del self._active[path]
+                        break
+                self._read_from(segment, resume)
+                self._read_segments.add(segment)
+            for path in active:
+                try:
+                    inode = os.stat(path).st_ino
+                except FileNotFoundError:
+                    continue
+                tracked_inode, offset = self._active.get(path, (None, 0))
+                if tracked_inode != inode:
+                    offset = 0
+                self._active[path] = (inode, self._read_from(path, offset))
+            if self._since_checkpoint >= self.checkpoint_every:
+                self.checkpoint()
+
+    @contextmanager
+    def _checkpoint_lock(self):
+        # A separate lock file, so replacing the checkpoint does not break the lock.
+        if fcntl is None:
+            yield
+            return
+        with open(self.checkpoint_lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def checkpoint(self):
+        """
+        Appends the records and acknowledgements indexed since the last checkpoint,
+        with the current read positions, to checkpoint_path. Costs O(new records);
+        processes may checkpoint the same log concurrently.
+        """
+        with self._lock:
+            if not self._indexed or not (self._unsaved or self._unsaved_notified or self._since_checkpoint):
+                return
+            with self._checkpoint_lock():
+                if self._replace_checkpoint:
+                    self._write_checkpoint(self._violations, self._notified, replace=True)
+                else:
+                    self._write_checkpoint(self._unsaved, self._unsaved_notified)
+            self._unsaved = {}
+            self._unsaved_notified = set()
+            self._replace_checkpoint = False
+            self._since_checkpoint = 0
+
+    def _write_checkpoint(self, violations: dict, notified: set, replace: bool = False):
+        delta = json.dumps({
+            "version": CHECKPOINT_VERSION,
+            "read_segments": sorted(self._read_segments),
+            "active": {path: list(position) for path, position in self._active.items()},
+            "violations": violations,
+            "notified": sorted(notified)
+        }, ensure_ascii=False) + "\n"
+        if not replace:
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(delta)
+            return
+        tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(delta)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _read_checkpoint(self) -> tuple[list[dict], bool]:
+        """
+        Returns the checkpoint's deltas up to the first unreadable one, and whether
+        the file needs rewriting (it has an unreadable entry or an older format).
+        """
+        deltas = []
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Ignoring checkpoint entries from a torn write in {self.checkpoint_path}.")
+                        return deltas, True
+                    if not isinstance(delta, dict) or delta.get("version") != CHECKPOINT_VERSION:
+                        logging.info(f"Ignoring checkpoint {self.checkpoint_path} in an older format.")
+                        return [], True
+                    deltas.append(delta)
+        except FileNotFoundError:
+            pass
+        return deltas, False
+
+    def _load_checkpoint(self):
+        """
+        Restores the indexes from checkpoint_path. A missing or stale checkpoint
+        (one naming segments that no longer exist) is ignored and the log is read
+        from the start; the next checkpoint then replaces it.
+        """
+        with self._checkpoint_lock():
+            deltas, damaged = self._read_checkpoint()
+            read_segments = set().union(*(delta["read_segments"] for delta in deltas))
+            if not read_segments <= set(self.log.segments()):
+                logging.info(f"Ignoring stale checkpoint {self.checkpoint_path}.")
+                deltas, damaged = [], True
+            if not deltas:
+                self._replace_checkpoint = damaged
+                return
+            stored = 0
+            for delta in deltas:
+                self._violations.update(delta["violations"])
+                self._notified.update(delta["notified"])
+                stored += len(delta["violations"])
+            for violation_id, record in self._violations.items():
+                self._index_fields(violation_id, record)
+            self._time_index = TimeIndex.build(self._violations)
+            self._read_segments = read_segments
+            self._active = {path: tuple(position) for path, position in deltas[-1]["active"].items()}
+            if damaged or stored > 2 * len(self._violations) + self.checkpoint_every:
+                # Fold the deltas into one: readers checkpointing concurrently store the same records.
+                self._write_checkpoint(self._violations, self._notified, replace=True)
+
+    def add(self, violation: dict, detected_by: str = None) -> dict:
+        return self.add_many([violation], detected_by)[0]
+
+    def add_many(self, violations: list[dict], detected_by: str = None) -> list[dict]:
+        """
+        Appends violations in one durable write. They are indexed only if this store
+        has been read from. Returns the stored records.
+        """
+        records = [normalize_violation(violation, detected_by) for violation in violations]
+        self.log.append_many(records)
+        if self._indexed:
+            self.refresh()
+        return records
+
+    def get(self, violation_id: str):
+        self._ensure_indexed()
+        with self._lock:
+            return self._violations.get(violation_id)
+
+    def _sorted(self, ids) -> list[dict]:
+        records = [self._violations[violation_id] for violation_id in ids]
+        return sorted(records, key=lambda record: timestamp_key(record["timestamp"]))
+
+    def by_domain(self, domain: str) -> list[dict]:
+        self._ensure_indexed()
+        with self._lock:
+            return self._sorted(self._domains.get(domain.lower(), ()))
+
+    def by_type(self, violation_type: str) -> list[dict]:
+        self._ensure_indexed()
+        with self._lock:
+            return self._sorted(self._types.get(violation_type, ()))
+
+    def by_detector(self, detected_by: str) -> list[dict]:
+        self._ensure_indexed()
+        with self._lock:
+            return self._sorted(self._detectors.get(detected_by, ()))
+
+    def in_range(self, start_time=None, end_time=None) -> list[dict]:
+        self._ensure_indexed()
+        with self._lock:
+            return [self._violations[violation_id] for violation_id in self._time_index.range(start_time, end_time)]
+
+    def pending_alerts(self) -> list[dict]:
+        """
+        Returns violations no alert has been sent for yet, oldest first.
+        """
+        with self._lock:
+            self.refresh()
+            return [self._violations[violation_id] for violation_id in self._time_index.range()
+                    if violation_id not in self._notified]
+
+    def mark_notified(self, violation_ids: list[str]):
+        self._ensure_indexed()
+        acks = [{"kind": "ack", "id": violation_id, "timestamp": datetime.utcnow().isoformat() + "Z"}
+                for violation_id in violation_ids if violation_id not in self._notified]
+        if not acks:
+            return
+        with self._lock:
+            self.log.append_many(acks)
+            self.refresh()
+
+    def __iter__(self):
+        self._ensure_indexed()
+        with self._lock:
+            return iter([self._violations[violation_id] for violation_id in self._time_index.range()])
+
+    def __len__(self) -> int:
+        self._ensure_indexed()
+        return len(self._violations)
+
+    def import_legacy(self, legacy_path: str, detected_by: str = None) -> int:
+        """
+        One-shot import of an old JSON violation file, then renames it to
+        <legacy_path>.migrated. Understands all three legacy shapes:
+        {"log_created", "entries": [...]} from violation_logger, a dict keyed by
+        violation_id from ViolationScanner, and {"violations": [...]} (with
+        "notified" flags) from alert_trigger. Only alert_trigger's file was ever
+        alerted on, so entries from the other shapes are imported as already
+        notified rather than mailed out as new. Entries are kept verbatim;
+        re-running an interrupted import does not duplicate them. Returns the
+        number imported.
+        """
+        if not os.path.exists(legacy_path):
+            return 0
+        try:
+            with open(legacy_path, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            logging.error(f"Cannot import {legacy_path}: invalid JSON. Leaving it in place.")
+            return 0
+
+        started = None
+        alerted = False
+        if isinstance(data, list):
+            entries = data
+        elif "entries" in data:
+            entries, started = data["entries"], data.get("log_created")
+        elif "violations" in data:
+            entries, alerted = data["violations"], True
+        else:
+            entries = list(data.values())
+        entries = [entry for entry in entries if isinstance(entry, dict)]
+
+        modified = os.path.getmtime(legacy_path)
+        records = [normalize_violation(entry, detected_by, modified) for entry in entries]
+        acks = [{"kind": "ack", "id": record["id"], "timestamp": record["timestamp"]}
+                for entry, record in zip(entries, records) if entry.get("notified") or not alerted]
+        if started:
+            started = _valid_timestamp(started, modified)
+        else:
+            started = min((record["timestamp"] for record in records), key=timestamp_key, default=_isoformat(modified))
+        with self._lock:
+            self.log.import_segment(records + acks, started)
+            os.replace(legacy_path, f"{legacy_path}.migrated")
+            if self._indexed:
+                self._rescan()
+        logging.info(f"Imported {len(records)} violations from {legacy_path} into {self.log.path}")
+        return len(records)
+
+    def _rescan(self):
+        # An imported segment may sort before segments already read; rebuild from scratch.
+        self._violations.clear()
+        self._domains.clear()
+        self._types.clear()
+        self._detectors.clear()
+        self._time_index = TimeIndex()
+        self._notified.clear()
+        self._read_segments.clear()
+        self._active.clear()
+        self._unsaved = {}
+        self._unsaved_notified = set()
+        self._replace_checkpoint = True
+        self.refresh()
+
+    def close(self):
+        self.checkpoint()
+        self.log.close()
+
+def get_violation_store(path: str = DEFAULT_VIOLATIONS_LOG, writer_id: str = None) -> ViolationStore:
+    """
+    Returns the process-wide store shared by violation_logger, ViolationScanner and alert_trigger.
+    The arguments only apply to the first call in a process.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ViolationStore(path, writer_id=writer_id)
+        return _default_store
@@ -1,25 +1,259 @@
-import whois
+import json
+import time
+import asyncio
+import sqlite3
 import logging
+import threading
+import whois
 
 logging.basicConfig(level=logging.INFO)
 
+WHOIS_CACHE_PATH = "whois_cache.db"
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+# Failures (timeouts, refusals, unparseable replies) are retried much sooner.
+DEFAULT_FAILURE_MAX_AGE = 15 * 60
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+# Per-registry overrides, {tld: (lookups per second, burst)}; tune to what each registry tolerates.
+REGISTRY_RATES = {}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS whois (
+    domain TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def _empty_result(domain):
+    return {
+        "domain": domain,
+        "registrar": None,
+        "creation_date": None,
+        "expiration_date": None,
+        "name_servers": None
+    }
+
+def _fetch_whois(domain):
+    data = whois.whois(domain)
+    return {
+        "domain": domain,
+        "registrar": data.registrar,
+        "creation_date": str(data.creation_date),
+        "expiration_date": str(data.expiration_date),
+        "name_servers": data.name_servers
+    }
+
 def whois_lookup(domain):
     try:
-        data = whois.whois(domain)
+        result = _fetch_whois(domain)
         logging.info(f"[WHOIS] Data fetched for {domain}")
-        return {
-            "domain": domain,
-            "registrar": data.registrar,
-            "creation_date": str(data.creation_date),
-            "expiration_date": str(data.expiration_date),
-            "name_servers": data.name_servers
-        }
+        return result
     except Exception as e:
         logging.error(f"[WHOIS] Failed for {domain}: {e}")
-        return {
-            "domain": domain,
-            "registrar": None,
-            "creation_date": None,
-            "expiration_date": None,
-            "name_servers": None
-        }
+        return _empty_result(domain)
+
+def normalize_domain(domain: str) -> str:
+    return domain.strip().rstrip(".").lower()
+
+def registry_for(domain: str) -> str:
+    """
+    Key used for rate limiting: the TLD, which identifies the registry's WHOIS server.
+    """
+    return normalize_domain(domain).rsplit(".", 1)[-1]
+
+class TokenBucket:
+    """
+    Allows rate acquisitions per second on average, in bursts of up to capacity.
+    Each caller reserves a token up front, so waiters are served in arrival
+    order and blocking and async callers can share one bucket. A cancelled
+    async waiter gives its token back.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes a token, going into debt if none is left. Returns how long to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def _release(self):
+        """
+        Returns a reserved token that will not be used.
+        """
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+
+class RegistryRateLimiter:
+    """
+    One TokenBucket per registry (TLD), created on first use.
+    """
+    def __init__(self, rates: dict = None, default_rate: float = DEFAULT_RATE, default_burst: float = DEFAULT_BURST):
+        self.rates = REGISTRY_RATES if rates is None else rates
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, domain: str) -> TokenBucket:
+        registry = registry_for(domain)
+        with self._lock:
+            bucket = self._buckets.get(registry)
+            if bucket is None:
+                rate, burst = self.rates.get(registry, (self.default_rate, self.default_burst))
+                bucket = self._buckets[registry] = TokenBucket(rate, burst)
+            return bucket
+
+class WhoisCache:
+    """
+    On-disk WHOIS results keyed by domain, with the time each was fetched and
+    whether the lookup succeeded. Freshness is decided by the reader.
+    """
+    def __init__(self, db_path: str = WHOIS_CACHE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def get(self, domain: str, max_age: float = DEFAULT_MAX_AGE, failure_max_age: float = DEFAULT_FAILURE_MAX_AGE):
+        """
+        Returns the cached result for domain, or None if there is none fresh enough.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT fetched_at, ok, data FROM whois WHERE domain = ?", (domain,)).fetchone()
+        if row is None:
+            return None
+        fetched_at, ok, data = row
+        if time.time() - fetched_at > (max_age if ok else failure_max_age):
+            return None
+        return json.loads(data)
+
+    def put(self, domain: str, data: dict, ok: bool = True):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO whois (domain, fetched_at, ok, data) VALUES (?, ?, ?, ?)",
+                              (domain, time.time(), int(ok), json.dumps(data, default=str)))
+
+    def purge(self, older_than: float = DEFAULT_MAX_AGE) -> int:
+        """
+        Deletes entries fetched more than older_than seconds ago. Returns the number deleted.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM whois WHERE fetched_at < ?", (time.time() - older_than,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM whois").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class CachedWhoisClient:
+    """
+    WHOIS lookups served from a WhoisCache while fresh; otherwise fetched at the
+    rate each registry allows and written back. Results that are still fresh cost
+    one SQLite read, so rescans are near-instant. Concurrent async lookups of
+    the same domain share one fetch. Lookups wait for their registry's rate
+    limit however long that takes; callers bound how many they queue (see
+    the scan engine's per-registry limit).
+    """
+    def __init__(self, cache: WhoisCache = None, limiter: RegistryRateLimiter = None,
+                 max_age: float = DEFAULT_MAX_AGE, failure_max_age: float = DEFAULT_FAILURE_MAX_AGE, fetch=None):
+        # An empty WhoisCache is falsy (it has a __len__), so test for None.
+        self.cache = cache if cache is not None else WhoisCache()
+        self.limiter = limiter if limiter is not None else RegistryRateLimiter()
+        self.max_age = max_age
+        self.failure_max_age = failure_max_age
+        self.fetch = fetch or _fetch_whois
+        self._in_flight = {}
+
+    def _fetch_and_store(self, domain: str) -> dict:
+        try:
+            result, ok = self.fetch(domain), True
+            logging.debug(f"[WHOIS] Data fetched for {domain}")
+        except Exception as e:
+            logging.error(f"[WHOIS] Failed for {domain}: {e}")
+            result, ok = _empty_result(domain), False
+        self.cache.put(domain, result, ok)
+        return result
+
+    def lookup(self, domain: str) -> dict:
+        domain = normalize_domain(domain)
+        cached = self.cache.get(domain, self.max_age, self.failure_max_age)
+        if cached is not None:
+            return cached
+        self.limiter.bucket(domain).acquire()
+        return self._fetch_and_store(domain)
+
+    async def lookup_async(self, domain: str) -> dict:
+        domain = normalize_domain(domain)
+        # The cache lock is shared with writer threads, so the read stays off the event loop.
+        cached = await asyncio.to_thread(self.cache.get, domain, self.max_age, self.failure_max_age)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        shared = self._in_flight.get(domain)
+        if shared is not None and shared.get_loop() is loop:
+            return await asyncio.shield(shared)
+        future = self._in_flight[domain] = loop.create_future()
+        # Mark the outcome retrieved, so a failure nobody else waited for is not logged as lost.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            await self.limiter.bucket(domain).acquire_async()
+            result = await asyncio.to_thread(self._fetch_and_store, domain)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._in_flight.get(domain) is future:
+                del self._in_flight[domain]
+
+def get_whois_client() -> CachedWhoisClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CachedWhoisClient()
+        return _default_client
+
+async def whois_lookup_async(domain):
+    """
+    Cached, rate-limited counterpart of whois_lookup using the shared CachedWhoisClient.
+    """
+    return await get_whois_client().lookup_async(domain)
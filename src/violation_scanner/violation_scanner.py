@@ -1,11 +1,20 @@
 # src/violation_scanner/violation_scanner.py 🔍🕵️‍♂️
 
+import asyncio
 import logging
-from src.utils.dns_lookup import perform_dns_lookup
-from src.utils.whois_lookup import perform_whois_lookup
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.dns_lookup import dns_lookup_async
+from src.utils.whois_lookup import DEFAULT_BURST, registry_for, whois_lookup_async
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+DEFAULT_CONCURRENCY = 64
+DEFAULT_TIMEOUT = 30.0
+# Domains of one registry (TLD) scanned at once. WHOIS lookups beyond the registry's
+# burst queue for its rate limit inside the timeout, so this stays near the burst.
+DEFAULT_PER_REGISTRY = DEFAULT_BURST
+
 # Dummy list of domains to simulate input (replace with real scan later)
 suspicious_domains = [
     "example-scam-site.com",
@@ -13,28 +22,128 @@ suspicious_domains = [
     "phishing-test.io"
 ]
 
-def scan_domains(domains):
-    results = []
+async def _run_lookup(lookup, domain: str, executor):
+    # Lookups may be coroutines (async resolvers) or blocking functions.
+    if asyncio.iscoroutinefunction(lookup):
+        return await lookup(domain)
+    return await asyncio.get_running_loop().run_in_executor(executor, lookup, domain)
+
+async def scan_domain_async(domain: str, resolve_dns=dns_lookup_async, lookup_whois=whois_lookup_async,
+                            timeout: float = DEFAULT_TIMEOUT, executor=None) -> dict:
+    """
+    Runs the DNS and WHOIS lookups for one domain concurrently. If they have not
+    both finished within timeout seconds, the missing one is reported as None and
+    the result gets an "error" field.
 
-    for domain in domains:
-        logging.info(f"🔎 Scanning domain: {domain}")
+    A blocking lookup that times out keeps its executor thread until it returns;
+    only the wait for it is abandoned.
+    """
+    logging.debug(f"🔎 Scanning domain: {domain}")
+    lookups = {
+        "dns_info": asyncio.ensure_future(_run_lookup(resolve_dns, domain, executor)),
+        "whois_info": asyncio.ensure_future(_run_lookup(lookup_whois, domain, executor)),
+    }
+    done, pending = await asyncio.wait(lookups.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
 
-        dns_info = perform_dns_lookup(domain)
-        whois_info = perform_whois_lookup(domain)
+    violation = {"domain": domain}
+    errors = []
+    for field, task in lookups.items():
+        if task in done and task.exception() is None:
+            violation[field] = task.result()
+        else:
+            violation[field] = None
+            errors.append(f"{field}: " + (f"timed out after {timeout}s" if task in pending else repr(task.exception())))
+    if errors:
+        violation["error"] = "; ".join(errors)
+        logging.warning(f"Scan of {domain} incomplete ({violation['error']})")
+    return violation
 
-        violation = {
-            "domain": domain,
-            "dns_info": dns_info,
-            "whois_info": whois_info,
-        }
+def _next_admissible(domains, waiting: dict, active: Counter, per_registry: int, max_waiting: int):
+    """
+    Returns the next (position, domain) whose registry has a free slot, taking
+    held-back domains first, or None. Domains of full registries are held back
+    in waiting, at most max_waiting of them, so the input is still read lazily.
+    """
+    for registry, queue in waiting.items():
+        if active[registry] < per_registry:
+            item = queue.popleft()
+            if not queue:
+                del waiting[registry]
+            return registry, item
+    held = sum(len(queue) for queue in waiting.values())
+    while held < max_waiting:
+        try:
+            position, domain = next(domains)
+        except StopIteration:
+            return None
+        registry = registry_for(domain)
+        if active[registry] < per_registry:
+            return registry, (position, domain)
+        waiting.setdefault(registry, deque()).append((position, domain))
+        held += 1
+    return None
 
-        # Print summary to console (can be removed later)
-        logging.info(f"📄 DNS: {dns_info}")
-        logging.info(f"📄 WHOIS: {whois_info}")
+async def iter_scan_results(domains, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                            resolve_dns=dns_lookup_async, lookup_whois=whois_lookup_async,
+                            per_registry: int = DEFAULT_PER_REGISTRY):
+    """
+    Scans domains with at most concurrency domains in flight and yields
+    (position, result) as each one completes. domains may be any iterable; it is
+    consumed lazily, so very large sweeps never schedule more than concurrency
+    tasks at once. Blocking lookups run on a thread pool of the same size.
+    At most per_registry domains of one TLD are in flight, so WHOIS rate limits
+    slow a single-registry sweep down instead of running its lookups into the
+    per-domain timeout. Domains of a full registry are held back (up to
+    concurrency of them) while later domains of other registries are scanned.
+    """
+    domains = iter(enumerate(domains))
+    in_flight = {}
+    waiting = {}
+    active = Counter()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scan")
+    try:
+        while True:
+            while len(in_flight) < concurrency:
+                admitted = _next_admissible(domains, waiting, active, per_registry, concurrency)
+                if admitted is None:
+                    break
+                registry, (position, domain) = admitted
+                task = asyncio.ensure_future(scan_domain_async(domain, resolve_dns, lookup_whois, timeout, executor))
+                in_flight[task] = (position, registry)
+                active[registry] += 1
+            if not in_flight:
+                return
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                position, registry = in_flight.pop(task)
+                active[registry] -= 1
+                yield position, task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        # Do not wait for timed-out blocking lookups still holding threads.
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        results.append(violation)
+async def scan_domains_async(domains, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                             resolve_dns=dns_lookup_async, lookup_whois=whois_lookup_async,
+                             per_registry: int = DEFAULT_PER_REGISTRY) -> list[dict]:
+    """
+    Scans domains concurrently. Returns the results in input order.
+    """
+    results = {}
+    async for position, violation in iter_scan_results(domains, concurrency, timeout, resolve_dns, lookup_whois,
+                                                       per_registry):
+        results[position] = violation
+    return [results[position] for position in sorted(results)]
 
-    return results
+def scan_domains(domains, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                 resolve_dns=dns_lookup_async, lookup_whois=whois_lookup_async):
+    """
+    Blocking wrapper around scan_domains_async for scripts.
+    """
+    return asyncio.run(scan_domains_async(domains, concurrency, timeout, resolve_dns, lookup_whois))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+import time
+import socket
+import struct
+import asyncio
+from src.utils.dns_lookup import (
+    AsyncDNSResolver, decode_name, encode_name, TYPE_A, TYPE_AAAA, TYPE_CNAME, TYPE_SOA
+)
+
+NEGATIVE_TTL = 45
+
+# (name, type) -> answer records (owner, type, ttl, value)
+ZONE = {
+    ("www.example.com", TYPE_A): [("www.example.com", TYPE_CNAME, 300, "example.com"),
+                                  ("example.com", TYPE_A, 60, "192.0.2.1"),
+                                  ("example.com", TYPE_A, 120, "192.0.2.2")],
+    ("www.example.com", TYPE_AAAA): [("www.example.com", TYPE_CNAME, 300, "example.com"),
+                                     ("example.com", TYPE_AAAA, 60, "2001:db8::1")],
+    ("big.example.com", TYPE_A): [("big.example.com", TYPE_A, 60, f"198.51.100.{i}") for i in range(40)],
+}
+for i in range(100):
+    ZONE[(f"host{i}.example.com", TYPE_A)] = [(f"host{i}.example.com", TYPE_A, 600, f"203.0.113.{i}")]
+# Names the stub server never answers.
+SILENT = {"silent.example.com"}
+
+
+def encode_record(owner: str, rtype: int, ttl: int, value) -> bytes:
+    if rtype == TYPE_A:
+        rdata = socket.inet_aton(value)
+    elif rtype == TYPE_AAAA:
+        rdata = socket.inet_pton(socket.AF_INET6, value)
+    elif rtype == TYPE_CNAME:
+        rdata = encode_name(value)
+    else:
+        rdata = encode_name("ns.example.com") + encode_name("hostmaster.example.com") + struct.pack(">5I", 1, 2, 3, 4, value)
+    return encode_name(owner) + struct.pack(">HHIH", rtype, 1, ttl, len(rdata)) + rdata
+
+
+def stub_answer(query: bytes, tcp: bool):
+    query_id, = struct.unpack_from(">H", query)
+    name, offset = decode_name(query, 12)
+    qtype, = struct.unpack_from(">H", query, offset)
+    if name in SILENT:
+        return None
+    answers = ZONE.get((name, qtype), [])
+    rcode = 0 if any(owner == name for owner, _ in ZONE) else 3
+    authority = [] if answers else [encode_record("example.com", TYPE_SOA, 3600, NEGATIVE_TTL)]
+    truncated = len(answers) > 20 and not tcp
+    if truncated:
+        answers = []
+    flags = 0x8180 | rcode | (0x0200 if truncated else 0)
+    header = struct.pack(">HHHHHH", query_id, flags, 1, len(answers), len(authority), 0)
+    return header + query[12:offset + 4] + b"".join(encode_record(*record) for record in answers) + b"".join(authority)
+
+
+class StubServer(asyncio.DatagramProtocol):
+    """
+    Authoritative-looking DNS server for ZONE on 127.0.0.1, over UDP and TCP.
+    """
+    def __init__(self):
+        self.udp_queries = 0
+        self.tcp_queries = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.udp_queries += 1
+        response = stub_answer(data, tcp=False)
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+    async def handle_tcp(self, reader, writer):
+        self.tcp_queries += 1
+        length, = struct.unpack(">H", await reader.readexactly(2))
+        response = stub_answer(await reader.readexactly(length), tcp=True)
+        writer.write(struct.pack(">H", len(response)) + response)
+        await writer.drain()
+        writer.close()
+
+
+def run_with_stub(test, **resolver_options):
+    """
+    Starts the stub server, runs test(resolver, server) in a fresh event loop and returns its result.
+    """
+    async def main():
+        loop = asyncio.get_running_loop()
+        server = StubServer()
+        transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        tcp_server = await asyncio.start_server(server.handle_tcp, "127.0.0.1", port)
+        options = {"timeout": 0.3, "attempts": 3, **resolver_options}
+        resolver = AsyncDNSResolver([("127.0.0.1", port)], **options)
+        try:
+            return await test(resolver, server)
+        finally:
+            resolver.close()
+            tcp_server.close()
+            transport.close()
+    return asyncio.run(main())
+
+
+def test_resolves_addresses_through_cname_chain():
+    async def test(resolver, server):
+        return await resolver.resolve("WWW.Example.com.")
+
+    result = run_with_stub(test)
+    assert result["status"] == "NOERROR"
+    assert result["a"] == ["192.0.2.1", "192.0.2.2"]
+    assert result["aaaa"] == ["2001:db8::1"]
+    assert result["cname"] == ["example.com"]
+
+
+def test_truncated_answer_is_retried_over_tcp():
+    async def test(resolver, server):
+        return await resolver.resolve("big.example.com"), server.tcp_queries
+
+    result, tcp_queries = run_with_stub(test)
+    assert len(result["a"]) == 40
+    assert tcp_queries == 1
+
+
+def test_nxdomain_is_cached_for_soa_negative_ttl():
+    async def test(resolver, server):
+        first = await resolver.resolve("missing.example.com")
+        queries = server.udp_queries
+        second = await resolver.resolve("missing.example.com")
+        return first, second, server.udp_queries - queries, resolver._cache[("missing.example.com", TYPE_A)][0]
+
+    first, second, repeat_queries, expires = run_with_stub(test)
+    assert first["status"] == second["status"] == "NXDOMAIN"
+    assert repeat_queries == 0
+    assert expires - time.monotonic() <= NEGATIVE_TTL
+
+
+def test_unanswered_query_times_out_and_is_not_cached():
+    async def test(resolver, server):
+        result = await resolver.resolve("silent.example.com")
+        return result, ("silent.example.com", TYPE_A) in resolver._cache
+
+    result, cached = run_with_stub(test, timeout=0.05, attempts=1)
+    assert result["status"] == "TIMEOUT"
+    assert not cached
+
+
+def test_invalid_name_is_rejected_without_a_query():
+    async def test(resolver, server):
+        return await resolver.resolve("bad..name"), server.udp_queries
+
+    result, queries = run_with_stub(test)
+    assert result["status"] == "BADNAME"
+    assert queries == 0
+
+
+def test_resolve_many_shares_queries_and_serves_repeats_from_cache():
+    names = [f"host{i}.example.com" for i in range(100)] * 3
+
+    async def test(resolver, server):
+        first = await resolver.resolve_many(names)
+        first_queries = server.udp_queries
+        second = await resolver.resolve_many(names)
+        return first, second, first_queries, server.udp_queries - first_queries
+
+    first, second, first_queries, second_queries = run_with_stub(test)
+    assert len(first) == 100
+    assert first["host7.example.com"]["a"] == ["203.0.113.7"]
+    # One A and one AAAA query per distinct name, duplicates shared.
+    assert first_queries == 200
+    assert second_queries == 0
+    assert second == first
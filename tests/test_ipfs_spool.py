@@ -0,0 +1,130 @@
+import json
+import time
+import threading
+import asyncio
+import pytest
+from src.protocol.decentralized_comm.content_id import compute_cid
+from src.protocol.decentralized_comm.payload_codec import decode_payload
+from src.protocol.decentralized_comm.ipfs_spool import IPFSSpool, SpoolFlusher
+
+
+class MemoryNode:
+    """
+    In-process stand-in for an IPFS node's add and cat calls.
+    """
+    def __init__(self):
+        self.blobs = {}
+
+    async def add_bytes(self, data: bytes) -> str:
+        await asyncio.sleep(0)
+        cid = compute_cid(data)
+        self.blobs[cid] = data
+        return cid
+
+    async def add_bytes_many(self, items: list[bytes]) -> list[str]:
+        return [await self.add_bytes(data) for data in items]
+
+    async def cat_json(self, cid: str):
+        return json.loads(decode_payload(self.blobs[cid]))
+
+
+def test_unpublished_payloads_are_readable_but_not_queued(tmp_path):
+    spool = IPFSSpool(str(tmp_path))
+    spool.put_many([("a", b"1"), ("b", b"2")], publish=False)
+    spool.put("c", b"3")
+    assert spool.get("a") == b"1"
+    assert spool.pending() == ["c"]
+
+    spool.publish(["a", "b"])
+    assert spool.pending() == ["c", "a", "b"]
+    assert spool.pending(2) == ["c", "a"]
+
+
+def test_startup_queues_payloads_left_on_disk_oldest_first(tmp_path):
+    spool = IPFSSpool(str(tmp_path))
+    for local_id in ["x", "y", "z"]:
+        spool.put(local_id, local_id.encode(), publish=False)
+        time.sleep(0.01)
+    assert IPFSSpool(str(tmp_path)).pending() == ["x", "y", "z"]
+
+
+def test_flusher_keeps_payloads_the_owner_did_not_record(tmp_path):
+    spool = IPFSSpool(str(tmp_path))
+    spool.put_many([("known", b"1"), ("unknown", b"2")])
+    node = MemoryNode()
+
+    async def on_flushed(flushed):
+        return [local_id for local_id, _ in flushed if local_id == "known"]
+
+    async def flush():
+        flusher = SpoolFlusher(spool, node.add_bytes_many, on_flushed)
+        return await flusher.flush()
+
+    assert asyncio.run(flush()) == 2
+    assert spool.get("known") is None
+    assert spool.get("unknown") == b"2"
+    assert spool.pending() == []
+    # Deferred payloads go back into the queue with the next publish.
+    spool.publish([])
+    assert spool.pending() == ["unknown"]
+
+
+def test_slow_index_commits_do_not_strand_spooled_memories(tmp_path):
+    pytest.importorskip("ipfshttpclient")
+    from src.core.memory.memory_index_backend import JournalIndexBackend
+    from src.core.memory.permanent_memory import PermanentMemory, SPOOL_ID_PREFIX
+
+    class SlowCommitBackend(JournalIndexBackend):
+        # Commits queue up one after another, as behind another process's compaction.
+        commit_lock = threading.Lock()
+
+        def put_many(self, records):
+            with self.commit_lock:
+                time.sleep(0.02)
+                super().put_many(records)
+
+    async def run():
+        spool = IPFSSpool(str(tmp_path / "spool"), fsync=False)
+        memory = PermanentMemory(MemoryNode(), index_backend=SlowCommitBackend(str(tmp_path / "memory_log.json")),
+                                 spool=spool, upload_batch_size=8)
+        batches = await asyncio.gather(*(
+            memory.store_memory_many([{"data": {"batch": b, "i": i}, "context_tags": ["t"], "creator_id": "test"}
+                                      for i in range(16)])
+            for b in range(100)
+        ))
+        await memory.flush_spool()
+        await memory.stop_flusher()
+        memory.content_cache.clear()
+        entry_ids = [entry_id for batch in batches for entry_id, _ in batch]
+        cids = [memory.memory_index[entry_id]["cid"] for entry_id in entry_ids]
+        memories = await memory.retrieve_memories_by_cid(cids)
+        return cids, memories, len(spool)
+
+    cids, memories, spooled = asyncio.run(run())
+    assert not [cid for cid in cids if cid.startswith(SPOOL_ID_PREFIX)]
+    assert len(memories) == 1600
+    assert spooled == 0
+
+
+def test_cache_charges_compressed_memories_at_their_decoded_size(tmp_path):
+    pytest.importorskip("ipfshttpclient")
+    from src.core.memory.memory_index_backend import JournalIndexBackend
+    from src.core.memory.permanent_memory import PermanentMemory
+    from src.protocol.decentralized_comm.payload_codec import PayloadCodec
+
+    async def run():
+        spool = IPFSSpool(str(tmp_path / "spool"), fsync=False)
+        memory = PermanentMemory(MemoryNode(), index_backend=JournalIndexBackend(str(tmp_path / "memory_log.json")),
+                                 spool=spool, compression=PayloadCodec("zlib"))
+        _, local_id = await memory.store_memory({"text": "x" * 10000}, ["t"], "test")
+        stored = spool.get(local_id)
+        charged_on_store = memory.content_cache.current_bytes
+        memory.content_cache.clear()
+        await memory.retrieve_memory_by_cid(local_id)
+        charged_on_read = memory.content_cache.current_bytes
+        await memory.stop_flusher()
+        return stored, charged_on_store, charged_on_read
+
+    stored, charged_on_store, charged_on_read = asyncio.run(run())
+    assert len(stored) < 1000
+    assert charged_on_store == charged_on_read == len(decode_payload(stored))
@@ -0,0 +1,60 @@
+import os
+import multiprocessing
+from datetime import datetime
+import pytest
+from src.utils.jsonl_log import JsonlLog
+from src.utils.violation_store import ViolationStore
+
+PROCESSES = 6
+RECORDS = 300
+
+
+def append_records(path, number, writer_id):
+    log = JsonlLog(path, max_bytes=20000, writer_id=writer_id)
+    for i in range(RECORDS):
+        # Every seventh record is larger than a segment, forcing rotations mid-run.
+        padding = "x" * (20000 if i % 7 == 0 else 10)
+        log.append({"timestamp": datetime.utcnow().isoformat() + "Z", "writer": number, "i": i, "pad": padding},
+                   durable=(i % 5 == 0))
+    log.close()
+
+
+def add_violations(path, number):
+    store = ViolationStore(path, max_bytes=5000, writer_id=f"scanner-{number}")
+    for i in range(50):
+        store.add({"violation_type": "test", "domain": f"{number}-{i}.example.com"})
+    store.close()
+
+
+def run_processes(target, args_for):
+    processes = [multiprocessing.Process(target=target, args=args_for(number)) for number in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+
+@pytest.mark.parametrize("per_writer", [False, True])
+def test_concurrent_appenders_lose_and_reorder_nothing(tmp_path, per_writer):
+    path = str(tmp_path / "violations.jsonl")
+    run_processes(append_records, lambda number: (path, number, f"w{number}" if per_writer else None))
+
+    records = list(JsonlLog(path))
+    assert len(records) == PROCESSES * RECORDS
+    for number in range(PROCESSES):
+        assert [record["i"] for record in records if record["writer"] == number] == list(range(RECORDS))
+    if per_writer:
+        # Per-writer segments are merged back into timestamp order.
+        timestamps = [record["timestamp"] for record in records]
+        assert timestamps == sorted(timestamps)
+
+
+def test_violation_store_sees_other_processes_after_refresh(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    reader = ViolationStore(path)
+    run_processes(add_violations, lambda number: (path, number))
+
+    reader.refresh()
+    assert len(reader) == PROCESSES * 50
+    assert len(ViolationStore(path)) == PROCESSES * 50
@@ -0,0 +1,85 @@
+import os
+import json
+import asyncio
+import threading
+import pytest
+from src.core.memory.memory_index_backend import JournalIndexBackend
+from src.core.memory.memory_journal import LEGACY_SNAPSHOT_MAGIC, PICKLE_SNAPSHOT_MAGIC, MemoryJournal
+
+
+def record(i):
+    return {"cid": f"cid-{i}", "tags": ["all"], "timestamp": f"2025-01-01T00:00:{i:02d}Z"}
+
+
+def write_legacy_snapshot(path, index, magic=LEGACY_SNAPSHOT_MAGIC):
+    with open(f"{path}.snap", "wb") as f:
+        f.write(magic + json.dumps({"index": index, "extras": {}}).encode("utf-8"))
+
+
+def test_compaction_writes_the_json_snapshot(tmp_path):
+    path = str(tmp_path / "memory_log.json")
+    backend = JournalIndexBackend(path)
+    backend.put_many([(f"e{i}", record(i)) for i in range(3)])
+    backend.compact()
+    backend.close()
+
+    with open(path) as f:
+        assert set(json.load(f)) == {"e0", "e1", "e2"}
+    assert os.path.getsize(f"{path}.journal") == 0
+    assert len(JournalIndexBackend(path)) == 3
+
+
+def test_legacy_snapshot_is_loaded_then_replaced_by_compaction(tmp_path):
+    path = str(tmp_path / "memory_log.json")
+    # The JSON snapshot is stale: earlier versions stopped updating it once .snap existed.
+    with open(path, "w") as f:
+        json.dump({"e0": record(0)}, f)
+    write_legacy_snapshot(path, {f"e{i}": record(i) for i in range(4)})
+
+    backend = JournalIndexBackend(path)
+    assert len(backend) == 4
+    backend.compact()
+    backend.close()
+
+    assert not os.path.exists(f"{path}.snap")
+    assert len(JournalIndexBackend(path)) == 4
+
+
+@pytest.mark.parametrize("contents", [PICKLE_SNAPSHOT_MAGIC + b"\x80\x04.", LEGACY_SNAPSHOT_MAGIC + b"{trunc",
+                                      b"garbage"])
+def test_unreadable_legacy_snapshot_fails_loudly(tmp_path, contents):
+    path = str(tmp_path / "memory_log.json")
+    with open(path, "w") as f:
+        json.dump({"e0": record(0)}, f)
+    with open(f"{path}.snap", "wb") as f:
+        f.write(contents)
+
+    with pytest.raises(ValueError):
+        MemoryJournal(path).load()
+
+
+def test_lazy_index_loads_off_the_event_loop(tmp_path):
+    pytest.importorskip("ipfshttpclient")
+    from src.core.memory.permanent_memory import PermanentMemory
+
+    path = str(tmp_path / "memory_log.json")
+    writer = JournalIndexBackend(path)
+    writer.put_many([(f"e{i}", record(i)) for i in range(3)])
+    writer.close()
+
+    class RecordingBackend(JournalIndexBackend):
+        def load(self):
+            self.loaded_on = threading.current_thread()
+            super().load()
+
+    async def run():
+        backend = RecordingBackend(path)
+        memory = PermanentMemory(None, index_backend=backend)
+        assert not backend.loaded
+        entries = await memory.query_memory_by_tags(["missing"])
+        return backend, entries
+
+    backend, entries = asyncio.run(run())
+    assert entries == []
+    assert backend.loaded
+    assert backend.loaded_on is not threading.main_thread()
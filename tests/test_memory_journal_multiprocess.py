@@ -0,0 +1,43 @@
+import multiprocessing
+from datetime import datetime
+from src.core.memory.memory_index_backend import JournalIndexBackend
+
+PROCESSES = 5
+RECORDS = 200
+
+
+def record(number, i):
+    return {"cid": f"cid-{number}-{i}", "tags": [f"writer-{number}", "all"],
+            "timestamp": datetime.utcnow().isoformat() + "Z", "parents": {}}
+
+
+def write_and_compact(path, number):
+    # A small compact_every makes the writers compact under each other's appends.
+    backend = JournalIndexBackend(path, compact_every=40)
+    for start in range(0, RECORDS, 4):
+        backend.put_many([(f"{number}-{i}", record(number, i)) for i in range(start, start + 4)])
+        if backend.needs_compaction():
+            backend.compact()
+    backend.close()
+
+
+def test_concurrent_writers_and_compactions_keep_every_entry(tmp_path):
+    path = str(tmp_path / "memory_log.json")
+    watcher = JournalIndexBackend(path, lazy=False)
+    processes = [multiprocessing.Process(target=write_and_compact, args=(path, number))
+                 for number in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    backend = JournalIndexBackend(path)
+    assert len(backend) == PROCESSES * RECORDS
+    assert len(backend.ids_for_tags(["all"])) == PROCESSES * RECORDS
+
+    # A process that loaded before the writers started catches up on refresh.
+    watcher.refresh()
+    assert len(watcher) == PROCESSES * RECORDS
+    assert len(watcher.ids_in_time_range()) == PROCESSES * RECORDS
+    assert len(watcher.ids_for_tags(["writer-3"])) == RECORDS
@@ -0,0 +1,40 @@
+import pytest
+from src.core.memory.memory_index_backend import JournalIndexBackend
+from src.core.memory.sqlite_index_backend import SQLiteIndexBackend
+
+
+def record(cid, parents):
+    return {"cid": cid, "tags": [], "timestamp": "2025-01-01T00:00:00Z", "parents": parents}
+
+
+@pytest.fixture(params=["journal", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "journal":
+        backend = JournalIndexBackend(str(tmp_path / "memory_log.json"))
+    else:
+        backend = SQLiteIndexBackend(str(tmp_path / "memory_index.db"))
+    # root <- mid <- leaf, and leaf also cites other directly.
+    backend.put_many([
+        ("e1", record("root", {})),
+        ("e2", record("mid", {"source_log_cid": ["root"]})),
+        ("e3", record("leaf", {"source_log_cid": ["mid"], "source_memory_cid": ["other"]})),
+    ])
+    yield backend
+    backend.close()
+
+
+@pytest.mark.parametrize("depth, ancestors", [
+    (0, []),
+    (1, ["mid", "other"]),
+    (2, ["mid", "other", "root"]),
+    (None, ["mid", "other", "root"]),
+])
+def test_ancestor_depth_counts_hops(backend, depth, ancestors):
+    assert backend.ancestor_cids("leaf", depth) == ancestors
+
+
+def test_walks_agree_across_backends(backend):
+    assert backend.ancestor_cids("leaf", 2, via="source_log_cid") == ["mid", "root"]
+    assert backend.descendant_cids("root", 0) == []
+    assert backend.descendant_cids("root", 1) == ["mid"]
+    assert backend.descendant_cids("root") == ["mid", "leaf"]
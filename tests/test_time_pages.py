@@ -0,0 +1,45 @@
+import pytest
+from src.core.memory.memory_index_backend import JournalIndexBackend
+from src.core.memory.sqlite_index_backend import SQLiteIndexBackend
+from src.core.memory.time_index import TimeIndex
+
+
+def record(i, timestamp):
+    return {"cid": f"cid-{i}", "tags": ["all"], "timestamp": timestamp, "parents": {}}
+
+
+@pytest.fixture(params=["journal", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "journal":
+        backend = JournalIndexBackend(str(tmp_path / "memory_log.json"))
+    else:
+        backend = SQLiteIndexBackend(str(tmp_path / "memory_index.db"))
+    yield backend
+    backend.close()
+
+
+def test_pages_neither_repeat_nor_skip_entries_written_mid_sweep(backend):
+    # Seven distinct timestamps, so most pages start inside a run of equal timestamps.
+    backend.put_many([(f"id{i:04d}", record(i, f"2025-01-01T00:00:{i % 7:02d}Z")) for i in range(1000)])
+    window = ("2025-01-01T00:00:01Z", "2025-01-01T00:00:05Z")
+    expected = backend.ids_in_time_range(*window)
+
+    seen = []
+    for number, page in enumerate(backend.iter_time_pages(*window, page_size=37)):
+        seen += page
+        # Entries landing before the cursor would shift an offset-based page.
+        backend.put_many([(f"new{number:03d}", record(number, "2025-01-01T00:00:01Z"))])
+
+    assert len(seen) == len(set(seen))
+    assert [entry_id for entry_id in seen if entry_id.startswith("id")] == expected
+
+
+def test_equal_timestamps_are_ordered_by_entry_id():
+    time_index = TimeIndex()
+    for entry_id in ["e5", "e3", "e9", "e1"]:
+        time_index.add(entry_id, "2025-01-01T00:00:00Z")
+    time_index.remove("e3", "2025-01-01T00:00:00Z")
+
+    assert time_index.range() == ["e1", "e5", "e9"]
+    first = time_index.page(limit=1)
+    assert [entry_id for _, entry_id in time_index.page(after=first[-1])] == ["e5", "e9"]
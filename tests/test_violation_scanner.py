@@ -0,0 +1,54 @@
+import time
+import asyncio
+from collections import Counter
+import pytest
+
+pytest.importorskip("whois")
+
+from src.utils.whois_lookup import CachedWhoisClient, RegistryRateLimiter, TokenBucket, WhoisCache, registry_for
+from src.violation_scanner.violation_scanner import scan_domains_async
+
+
+def test_rate_limited_registry_is_paced_not_dropped(tmp_path):
+    in_flight = Counter()
+    peak = Counter()
+
+    async def resolve_dns(domain):
+        registry = registry_for(domain)
+        in_flight[registry] += 1
+        peak[registry] = max(peak[registry], in_flight[registry])
+        await asyncio.sleep(0)
+        in_flight[registry] -= 1
+        return {"a": []}
+
+    def fetch(domain):
+        return {"domain": domain, "registrar": "Example Registrar"}
+
+    # 64 domains in flight against 100 lookups/s: unpaced, the tail of the .com
+    # token queue would wait well past the timeout.
+    client = CachedWhoisClient(WhoisCache(str(tmp_path / "whois.db")),
+                               RegistryRateLimiter(default_rate=100, default_burst=5), fetch=fetch)
+    domains = [f"site{i}.com" for i in range(200)] + [f"site{i}.org" for i in range(20)]
+    results = asyncio.run(scan_domains_async(domains, concurrency=64, timeout=0.3, resolve_dns=resolve_dns,
+                                             lookup_whois=client.lookup_async, per_registry=5))
+
+    assert [result["domain"] for result in results] == domains
+    assert [result["domain"] for result in results if result["whois_info"] is None] == []
+    assert peak["com"] <= 5
+
+
+def test_cancelled_waiter_returns_its_token():
+    bucket = TokenBucket(rate=1, capacity=1)
+
+    async def run():
+        await bucket.acquire_async()
+        waiter = asyncio.ensure_future(bucket.acquire_async())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        started = time.monotonic()
+        await bucket.acquire_async()
+        return time.monotonic() - started
+
+    # Without the returned token the next caller would wait about two seconds.
+    assert asyncio.run(run()) < 1.5
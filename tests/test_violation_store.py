@@ -0,0 +1,126 @@
+import json
+
+from src.utils.violation_store import ViolationStore
+
+
+def violation(i):
+    return {"id": f"v{i}", "timestamp": f"2025-01-01T00:00:{i:02d}Z", "violation_type": "mirror", "domain": "example.com"}
+
+
+def checkpoint_lines(store):
+    with open(store.checkpoint_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writer_appends_without_indexing(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    writer = ViolationStore(path, writer_id="scanner")
+    writer.add_many([violation(i) for i in range(5)])
+    assert not writer.indexed
+    assert writer._violations == {}
+
+    reader = ViolationStore(path)
+    assert [v["id"] for v in reader.pending_alerts()] == [f"v{i}" for i in range(5)]
+    writer.close()
+    reader.close()
+
+
+def test_checkpoint_appends_only_new_records(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    writer = ViolationStore(path, writer_id="scanner")
+    reader = ViolationStore(path)
+    writer.add_many([violation(i) for i in range(3)])
+    reader.pending_alerts()
+    reader.checkpoint()
+    writer.add_many([violation(i) for i in range(3, 5)])
+    reader.mark_notified(["v0"])
+    reader.checkpoint()
+    reader.checkpoint()
+
+    lines = checkpoint_lines(reader)
+    assert len(lines) == 2
+    assert sorted(lines[0]["violations"]) == ["v0", "v1", "v2"]
+    assert sorted(lines[1]["violations"]) == ["v3", "v4"]
+    assert lines[1]["notified"] == ["v0"]
+    writer.close()
+    reader.close()
+
+
+def test_reader_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    writer = ViolationStore(path, writer_id="scanner")
+    writer.add_many([violation(i) for i in range(3)])
+    first = ViolationStore(path)
+    first.mark_notified(["v1"])
+    first.close()
+    writer.add_many([violation(3)])
+
+    second = ViolationStore(path)
+    second.refresh()
+    # Only the record appended after the checkpoint is read from the log.
+    assert second._since_checkpoint == 1
+    assert [v["id"] for v in second.pending_alerts()] == ["v0", "v2", "v3"]
+    assert [v["id"] for v in second.in_range("2025-01-01T00:00:01Z", "2025-01-01T00:00:02Z")] == ["v1", "v2"]
+    assert len(second.by_domain("EXAMPLE.com")) == 4
+    writer.close()
+    second.close()
+
+
+def test_duplicate_deltas_are_folded(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    writer = ViolationStore(path, writer_id="scanner")
+    writer.add_many([violation(i) for i in range(4)])
+    # Readers that started together each checkpoint the same records.
+    readers = [ViolationStore(path) for _ in range(4)]
+    for reader in readers:
+        reader.refresh()
+    for reader in readers:
+        reader.checkpoint()
+    assert len(checkpoint_lines(readers[0])) == 4
+
+    fresh = ViolationStore(path, checkpoint_every=1)
+    assert len(fresh) == 4
+    lines = checkpoint_lines(fresh)
+    assert len(lines) == 1 and sorted(lines[0]["violations"]) == [f"v{i}" for i in range(4)]
+    writer.close()
+
+
+def test_torn_or_stale_checkpoint_falls_back_to_the_log(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    writer = ViolationStore(path, writer_id="scanner")
+    writer.add_many([violation(i) for i in range(2)])
+    reader = ViolationStore(path)
+    reader.refresh()
+    reader.checkpoint()
+    writer.add_many([violation(2)])
+    reader.refresh()
+    reader.checkpoint()
+    with open(reader.checkpoint_path, "r+") as f:
+        lines = f.readlines()
+        f.seek(0)
+        f.truncate()
+        f.write(lines[0] + lines[1][:20])
+
+    torn = ViolationStore(path)
+    assert sorted(v["id"] for v in torn) == ["v0", "v1", "v2"]
+    assert len(checkpoint_lines(torn)) == 1
+
+    with open(reader.checkpoint_path, "w") as f:
+        f.write(json.dumps({"version": 2, "read_segments": [path + ".20200101T000000000000"], "active": {},
+                            "violations": {"gone": violation(9)}, "notified": []}) + "\n")
+    stale = ViolationStore(path)
+    assert sorted(v["id"] for v in stale) == ["v0", "v1", "v2"]
+    stale.close()
+    assert sorted(checkpoint_lines(stale)[0]["violations"]) == ["v0", "v1", "v2"]
+    writer.close()
+
+
+def test_legacy_import_keeps_alert_state(tmp_path):
+    path = str(tmp_path / "violations.jsonl")
+    legacy = tmp_path / "violations.json"
+    legacy.write_text(json.dumps({"violations": [dict(violation(0), notified=True), violation(1)]}))
+    store = ViolationStore(path)
+    assert store.import_legacy(str(legacy)) == 2
+    assert [v["id"] for v in store.pending_alerts()] == ["v1"]
+    assert store.import_legacy(str(legacy)) == 0
+    store.close()